@@ -0,0 +1,30 @@
+# Copyright 2014 Harri Ojanen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# navigation.diagrams
+#
+# Diagrams for the Brown-Nassau spherical computer and the Rust diagram.
+#
+# The geometry of the diagrams is available here without matplotlib:
+#
+#   from navigation.diagrams import brown_nassau, grid_curves
+#
+# Each diagram is rendered by the create() function of its own module,
+# brown_nassau_quarter, brown_nassau_semi, rust_diagram or
+# rust_auxiliary, and matplotlib is imported only then.
+
+from .geometry import *
+from .inverse import *
+from .scales import *
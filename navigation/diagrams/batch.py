@@ -0,0 +1,167 @@
+# Copyright 2014 Harri Ojanen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# batch.py
+#
+# Renders many diagram variants in parallel, one figure per worker
+# process.
+#
+# A variant is a dict with the keys
+#
+#   'diagram'   one of DIAGRAMS
+#   'styles'    'lines', 'dots' or a list of style dicts, one per style
+#               tier of 'blk_step' (see geometry.tier()); the named
+#               ones have two, for a single blk_step interval
+#               (Brown-Nassau diagrams only)
+#   'step', 'blk_step', 'flipped'
+#               as for create() of the Brown-Nassau diagrams
+#   'backend', 'density', 'chunk', 'min_gap', 'heatmap'
+#               as for draw() of the Brown-Nassau diagrams
+#   'simplification'
+#               as for draw() of the diagram, see simplify.py
+#   'formats'   as in export.py
+#   'dire'      output directory
+#
+# Missing keys take the defaults of the diagram module. Run as
+#
+#   python -m navigation.diagrams.batch [-j N] [--profile FILE]
+#                                       [output directory]
+#
+# to regenerate all diagrams, with --profile writing the stage timings
+# of each diagram into FILE (see profiling.py).
+
+import importlib
+import os
+import time
+
+from . import profiling
+
+DIAGRAMS = ('brown_nassau_quarter', 'brown_nassau_semi',
+            'rust_diagram', 'rust_auxiliary')
+
+
+#############################################################################
+# variants
+
+def default_variants(dire=None, formats=('svg','pdf')):
+    variants = [
+        {'diagram': 'brown_nassau_quarter', 'styles': 'lines', 'flipped': False},
+        {'diagram': 'brown_nassau_quarter', 'styles': 'lines', 'flipped': True},
+        {'diagram': 'brown_nassau_quarter', 'styles': 'dots', 'flipped': False},
+        {'diagram': 'brown_nassau_semi', 'styles': 'lines', 'flipped': False},
+        {'diagram': 'brown_nassau_semi', 'styles': 'dots', 'flipped': False},
+        {'diagram': 'rust_diagram'},
+        {'diagram': 'rust_auxiliary'},
+    ]
+    for v in variants:
+        v['formats'] = formats
+        if dire is not None:
+            v['dire'] = dire
+    return variants
+
+def diagram_module(name):
+    if name not in DIAGRAMS:
+        raise ValueError('unknown diagram %r, expected one of %s'
+                         % (name, ', '.join(DIAGRAMS)))
+    return importlib.import_module('navigation.diagrams.' + name)
+
+def variant_styles(module, styles):
+    if styles == 'lines':
+        return module.line_styles
+    elif styles == 'dots':
+        return module.dot_styles
+    else:
+        return styles
+
+
+#############################################################################
+# rendering
+
+# render a single variant, returns a dict with the variant, the written
+# paths, the artist and vertex counts of the figure and the wall time in
+# seconds of drawing and saving it, which excludes the counting
+def render_variant(variant):
+    module = diagram_module(variant['diagram'])
+    dire = variant.get('dire', module.dire)
+    formats = variant.get('formats', ('svg','pdf'))
+    simplification = variant.get('simplification', module.simplification)
+
+    t0 = time.time()
+    if variant['diagram'].startswith('brown_nassau'):
+        styles = variant_styles(module, variant.get('styles', 'lines'))
+        flipped = variant.get('flipped', False)
+        with profiling.diagram(module.diagram_name(styles, flipped)):
+            fig = module.draw(styles,
+                              variant.get('step', module.step),
+                              variant.get('blk_step', module.blk_step),
+                              flipped,
+                              simplification=simplification,
+                              backend=variant.get('backend', module.backend),
+                              density=variant.get('density', module.density),
+                              chunk=variant.get('chunk', module.chunk),
+                              min_gap=variant.get('min_gap', module.min_gap),
+                              heatmap=variant.get('heatmap', module.heatmap))
+            paths = module.save_diagram(fig, styles, flipped, dire, formats)
+    else:
+        with profiling.diagram(module.file_name):
+            fig = module.draw(simplification=simplification)
+            paths = module.render.save(fig, dire, module.file_name, formats)
+
+    t = time.time() - t0
+    return {'variant': variant, 'paths': paths, 'time': t,
+            'artists': profiling.artist_count(fig),
+            'vertices': profiling.vertex_count(fig)}
+
+# render all variants over a process pool, results in the order of the
+# variants
+def run(variants, workers=None):
+    if workers == 1:
+        return [render_variant(v) for v in variants]
+
+    from concurrent.futures import ProcessPoolExecutor
+    if workers is None:
+        workers = min(len(variants), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max(workers, 1)) as pool:
+        return list(pool.map(render_variant, variants))
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='Render all diagrams.')
+    parser.add_argument('dire', nargs='?', default=None,
+                        help='output directory, default per diagram')
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='number of worker processes')
+    parser.add_argument('--profile', default=None, metavar='FILE',
+                        help='append stage timings as JSON lines to FILE')
+    parser.add_argument('--profile-mode', default=None,
+                        choices=['tracemalloc', 'cprofile'],
+                        help='also trace allocations or run cProfile')
+    args = parser.parse_args(argv)
+    if args.profile:
+        # through the environment, so that the workers profile too
+        os.environ['NAVIGATION_PROFILE'] = os.path.abspath(args.profile)
+        if args.profile_mode:
+            os.environ['NAVIGATION_PROFILE_MODE'] = args.profile_mode
+        profiling.start(os.environ['NAVIGATION_PROFILE'], args.profile_mode)
+
+    t0 = time.time()
+    results = run(default_variants(args.dire), args.workers)
+    for r in results:
+        print('%6.2fs  %s' % (r['time'], ' '.join(r['paths'])))
+    print('%6.2fs  total' % (time.time() - t0))
+
+if __name__ == '__main__':
+    main()
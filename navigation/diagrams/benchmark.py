@@ -0,0 +1,345 @@
+# Copyright 2014 Harri Ojanen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# benchmark.py
+#
+# Benchmarks of the stages of the diagrams:
+#
+#   transform/<n>          brown_nassau() on n points, 1e3 .. 1e7
+#   transform/out/<n>      the same into preallocated arrays, with a
+#                          workspace of its own
+#   inverse/<path>         inverse_brown_nassau() exact and fast on the
+#                          pixels of a scanned rotor, 1448 x 1448
+#   grid/<layout>/<kind>   grid curves and dots, without the cache
+#   ticks/<layout>         tick mark geometry of the arc scales
+#   draw/<variant>/<backend>
+#                          draw the quarter line diagram, not saved
+#   create/<variant>/<backend>
+#                          draw and save a batch variant as svg and pdf
+#   export/<format>        write a drawn figure in one format
+#
+# Each case records the wall time (best of 'repeat' runs, or of more
+# for fast cases), the peak of memory allocated during a further run
+# under tracemalloc (numpy included), the peak RSS of the process so
+# far and, where they apply, the numbers of artists and vertices and
+# the bytes written. The geometry cache is off, so every run computes
+# everything. Run as
+#
+#   python -m navigation.diagrams.benchmark [-o results.json]
+#                                           [-b baseline.json] [-k text]
+#                                           [--quick]
+#
+# to write the results as JSON and compare them with a baseline written
+# the same way; metrics worse than the baseline by more than their
+# tolerance are reported and the exit status is 1, as it is when a
+# case that is there to be faster than another (see 'faster') is not.
+
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from numpy import empty, linspace, meshgrid, pi, random
+
+from . import batch, geometry, inverse, render, scales
+from .profiling import artist_count, peak_rss, vertex_count
+
+# relative increase over the baseline reported as a regression
+tolerances = {'time': .25, 'peak_bytes': .10, 'artists': 0.,
+              'vertices': .01, 'output_bytes': .01}
+
+# and times differing by less than this many seconds are taken as noise
+time_floor = .005
+
+SIZES = (10**3, 10**4, 10**5, 10**6, 10**7)
+
+# (case, reference) where the case must take less time
+faster = [('inverse/fast', 'inverse/exact'),
+          ('transform/out/1e+07', 'transform/1e+07')]
+
+
+#############################################################################
+# counts
+
+def file_bytes(paths):
+    return sum([os.path.getsize(p) for p in paths])
+
+
+#############################################################################
+# cases
+#
+# a case is (name, setup) where setup() returns a function to time;
+# what that function returns, a dict of counts or None, is recorded
+
+def transform_cases(sizes):
+    def setup(n, preallocated):
+        rng = random.default_rng(0)
+        d = rng.uniform(0, pi/2, n)
+        t = rng.uniform(0, pi/2, n)
+        out = work = None
+        if preallocated:
+            out = (empty(n), empty(n))
+            work = geometry.Workspace()
+        def run():
+            geometry.brown_nassau(d, t, out=out, work=work)
+        return run
+    return ([('transform/%.0e' % n, lambda n=n: setup(n, False))
+             for n in sizes] +
+            [('transform/out/%.0e' % n, lambda n=n: setup(n, True))
+             for n in sizes])
+
+def inverse_cases():
+    def setup(fast):
+        u = linspace(-pi/2, pi/2, 1448)
+        xp, yp = meshgrid(u, u)
+        def run():
+            if fast:
+                inverse.inverse_brown_nassau_fast(xp, yp)
+            else:
+                inverse.inverse_brown_nassau(xp, yp)
+        return run
+    return [('inverse/exact', lambda: setup(False)),
+            ('inverse/fast', lambda: setup(True))]
+
+def grid_cases():
+    def setup(layout, kind):
+        def run():
+            if kind == 'dots':
+                tiers = geometry.grid_dots(1, 5, False, layout)
+            else:
+                tiers = geometry.grid_curves(1, 5, False, layout)
+            return {'vertices': sum([len(x) for tier in tiers
+                                     for (x, y) in tier])}
+        return run
+    return [('grid/%s/%s' % (layout, kind),
+             lambda layout=layout, kind=kind: setup(layout, kind))
+            for layout in geometry.LAYOUTS for kind in ('lines', 'dots')]
+
+def tick_cases():
+    def quarter():
+        segs = [scales.degree_ticks(0, 90)]
+        for (offset, sgn) in ((0, 1), (90, -1)):
+            segs.append(scales.vernier_ticks(offset, sgn))
+        return {'vertices': 2*sum([len(s) for s in segs])}
+    def semi():
+        segs = [scales.degree_ticks(-90, 90)]
+        for (offset, sgn) in ((0, 1), (90, -1), (-90, 1)):
+            segs.append(scales.vernier_ticks(offset, sgn))
+        return {'vertices': 2*sum([len(s) for s in segs])}
+    return [('ticks/quarter', lambda: quarter), ('ticks/semi', lambda: semi)]
+
+def variant_name(v):
+    name = v['diagram']
+    if 'styles' in v:
+        name += '-' + v['styles']
+    if v.get('flipped'):
+        name += '-flipped'
+    return name
+
+def create_cases(dire):
+    cases = []
+    for v in batch.default_variants(dire):
+        module = batch.diagram_module(v['diagram'])
+        backends = ['matplotlib']
+        if hasattr(module, 'backend'):
+            backends = list(render.BACKENDS)
+        for b in backends:
+            def setup(v=v, b=b):
+                v = dict(v)
+                if hasattr(batch.diagram_module(v['diagram']), 'backend'):
+                    v['backend'] = b
+                def run():
+                    r = batch.render_variant(v)
+                    return {'artists': r['artists'],
+                            'vertices': r['vertices'],
+                            'output_bytes': file_bytes(r['paths'])}
+                return run
+            cases.append(('create/%s/%s' % (variant_name(v), b), setup))
+    return cases
+
+def export_cases(dire):
+    from . import brown_nassau_quarter as q
+    from .export import export, tight_bbox
+
+    def setup(fmt):
+        fig = q.draw(q.line_styles, q.step, q.blk_step, False,
+                     backend='matplotlib')
+        def run():
+            paths = export(fig, dire, 'export', [fmt])
+            return {'artists': artist_count(fig),
+                    'vertices': vertex_count(fig),
+                    'output_bytes': file_bytes(paths)}
+        return run
+
+    def setup_tight():
+        fig = q.draw(q.line_styles, q.step, q.blk_step, False,
+                     backend='matplotlib')
+        def run():
+            tight_bbox(fig, refresh=True)
+        return run
+
+    formats = ['svg', 'pdf', ('png', 300)]
+    return ([('export/%s' % (fmt if isinstance(fmt, str) else
+                             '%s%d' % fmt), lambda fmt=fmt: setup(fmt))
+             for fmt in formats] +
+            [('export/tight_bbox', setup_tight)])
+
+def draw_cases():
+    from . import brown_nassau_quarter as q
+    def setup(b):
+        def run():
+            fig = q.draw(q.line_styles, q.step, q.blk_step, False, backend=b)
+            return {'artists': artist_count(fig),
+                    'vertices': vertex_count(fig)}
+        return run
+    return [('draw/brown_nassau_quarter-lines/%s' % b, lambda b=b: setup(b))
+            for b in render.BACKENDS]
+
+def all_cases(dire, quick=False):
+    sizes = SIZES[:-1] if quick else SIZES
+    return (transform_cases(sizes) + inverse_cases() + grid_cases() +
+            tick_cases() + draw_cases() + create_cases(dire) +
+            export_cases(dire))
+
+
+#############################################################################
+# measuring
+
+# best of at least 'repeat' runs, and of more while they take less than
+# min_time seconds in all, which steadies the fast cases
+def measure(setup, repeat=3, min_time=.5):
+    from . import cache
+    enabled = cache.enabled
+    cache.enabled = False
+    try:
+        fn = setup()
+        best = None
+        runs = 0
+        total = 0.
+        while runs < repeat or (total < min_time and runs < 1000):
+            t0 = time.perf_counter()
+            counts = fn()
+            t = time.perf_counter() - t0
+            if best is None or t < best:
+                best = t
+            runs += 1
+            total += t
+
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        cache.enabled = enabled
+        tracemalloc.stop()
+
+    result = {'time': best, 'peak_bytes': peak, 'peak_rss': peak_rss()}
+    result.update(counts or {})
+    return result
+
+def run(cases, repeat=3, out=sys.stdout):
+    results = {}
+    for (name, setup) in cases:
+        r = measure(setup, repeat)
+        results[name] = r
+        if out is not None:
+            out.write('%-52s %9.4fs %9.1f MB\n'
+                      % (name, r['time'], r['peak_bytes']/2.**20))
+            out.flush()
+    return {'machine': {'python': platform.python_version(),
+                        'platform': platform.platform(),
+                        'processor': platform.processor(),
+                        'cpus': os.cpu_count()},
+            'repeat': repeat,
+            'cases': results}
+
+
+#############################################################################
+# comparing
+
+# metrics worse than in the baseline by more than their tolerance, as
+# (case, metric, baseline, value)
+def compare(results, baseline, tolerances=tolerances):
+    worse = []
+    for (name, r) in sorted(results['cases'].items()):
+        b = baseline['cases'].get(name)
+        if b is None:
+            continue
+        for (metric, tol) in sorted(tolerances.items()):
+            if metric not in r or metric not in b:
+                continue
+            if metric == 'time' and r[metric] - b[metric] < time_floor:
+                continue
+            if r[metric] > b[metric]*(1+tol):
+                worse.append((name, metric, b[metric], r[metric]))
+    return worse
+
+# the pairs of 'faster' both run where the case is not faster, as
+# (case, reference, time, reference time)
+def not_faster(results, pairs=faster):
+    slow = []
+    for (name, ref) in pairs:
+        r = results['cases'].get(name)
+        b = results['cases'].get(ref)
+        if r is not None and b is not None and r['time'] >= b['time']:
+            slow.append((name, ref, r['time'], b['time']))
+    return slow
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark the diagrams.')
+    parser.add_argument('-o', '--output', default='benchmark.json',
+                        help='results file, default benchmark.json')
+    parser.add_argument('-b', '--baseline', default=None,
+                        help='results to compare with')
+    parser.add_argument('-k', '--select', default=None,
+                        help='only cases whose name contains this')
+    parser.add_argument('-r', '--repeat', type=int, default=3,
+                        help='runs per case, the best is recorded')
+    parser.add_argument('--quick', action='store_true',
+                        help='skip the largest transform, one run per case')
+    args = parser.parse_args(argv)
+
+    dire = tempfile.mkdtemp(prefix='navigation-benchmark-')
+    try:
+        cases = all_cases(dire, args.quick)
+        if args.select:
+            cases = [c for c in cases if args.select in c[0]]
+        results = run(cases, 1 if args.quick else args.repeat)
+    finally:
+        shutil.rmtree(dire, ignore_errors=True)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=1, sort_keys=True)
+
+    status = 0
+    for (name, ref, t, t_ref) in not_faster(results):
+        print('not faster: %s %gs, %s %gs' % (name, t, ref, t_ref))
+        status = 1
+    if args.baseline:
+        with open(args.baseline) as f:
+            worse = compare(results, json.load(f))
+        for (name, metric, b, r) in worse:
+            print('worse: %s %s %g -> %g' % (name, metric, b, r))
+        if worse:
+            status = 1
+    return status
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,368 @@
+# Copyright 2014 Harri Ojanen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# brown_nassau_quarter.py
+#
+# Creates diagrams of the base and two rotors of a Brown-Nassau
+# spherical computer.
+#
+# Required:
+# python
+# matplotlib
+#
+# Run as
+#   python -m navigation.diagrams.brown_nassau_quarter
+# to write all variants into the home directory, or call create().
+#
+# The Brown-Nassau Spherical Computer is a device for graphically
+# solving the astronomical triangle, i.e., for transforming from
+# azimuthal coordinates to equatorial coordinates. It can be used for
+# star identification or sight planning and reduction in celestial
+# navigation, among others.
+#
+# Descriptions of it can be found in the following:
+#
+# O. E. Brown and J. J. Nassau, A Navigation Computer, The American
+# Mathematical Monthly, Vol. 54, No. 8 (Oct., 1947), pp. 453-458.
+#
+# John Lyukx, The Brown-Nassau Spherical Computer, Navigator's
+# Newsletter, issue 62, 1998-1999, pp. 12-15. (available online at
+# http://www.starpath.com/foundation/newsletter.htm)
+#
+# The Smithsonian Institution has an example with a photograph at
+# http://collections.si.edu/search/results.htm?q=record_ID%3Anasm_A19700379000&repo=DPLA
+
+
+#############################################################################
+
+from numpy import *
+import datetime
+import os.path
+
+from .cache import grid_chunks, grid_dots
+from .geometry import angle_range, check_tiers, tier_steps
+from .scales import *
+from . import profiling, render
+
+font_size=5
+
+# default output directory
+dire = os.path.expanduser("~")
+
+# polyline simplification of the grid lines in points, None to draw
+# every computed vertex (see simplify.py)
+simplification = {'tol': .05, 'grid': .01}
+
+# 'native' writes svg and pdf directly (see vector.py), 'matplotlib' is
+# the reference and also writes raster formats
+backend = 'native'
+
+# samples per degree along the grid curves, and the number of curves
+# computed and drawn at a time, None for the whole grid at once from the
+# cache (see geometry.iter_grid_curves())
+density = 1
+chunk = None
+
+# thinning of the grid near the pole: None for the fixed rules of
+# geometry.ellipse_span(), or the least distance in points between
+# neighbouring curves of a tier, and dots along the lines of a dot
+# diagram, measured from the scale factors of the projection (see
+# geometry.grid_scales()). density='auto' likewise samples the curves
+# for segments of at most max_segment points.
+min_gap = None
+max_segment = 1.
+
+# a scale of geometry.SCALES drawn as a heat map under the grid, e.g.
+# 'ellipse_gap', or None; backend='matplotlib' only
+heatmap = None
+
+
+#############################################################################
+# draw the brown nassau grid
+#
+# with batched=True all curves of a style tier become a single artist,
+# and the dots of a dot diagram a single collection with each dot once
+
+def draw_grid(ax, styles, step, blk_step, flipped, batched=True,
+              simplification=None, density=density, chunk=chunk,
+              min_gap=min_gap):
+    density, min_gap = render.grid_units(ax, 'quarter', density, min_gap,
+                                         max_segment)
+    is_line_diagram = styles[0]['marker'] == '-'
+    if is_line_diagram or not batched:
+        chunks = grid_chunks(step, blk_step, flipped, 'quarter',
+                             not is_line_diagram, density, chunk, min_gap)
+    else:
+        chunks = [grid_dots(step, blk_step, flipped, 'quarter', density=density,
+                            min_gap=min_gap)]
+    if not is_line_diagram:
+        simplification = None
+    render.draw_chunks(ax, chunks, styles, batched, simplification, 'grid')
+
+
+#############################################################################
+# tick marks, labels and verniers for arc
+
+def verniers(ax,clr,flipped):
+    segs = []
+    marks = []
+    for offset in [0,90]:
+        if offset == 0:
+            sgn = 1
+        else:
+            sgn = -1
+
+        d, r = vernier_angles(offset, sgn)
+        segs.append(vernier_ticks(offset, sgn))
+        marks.append(arc_ticks(radians([offset]),90.5,91))
+
+        for i in [10,20,30]:
+            if flipped:
+                ii=i
+            else:
+                ii=30-i
+            ax.text(90.5*cos(radians(d[i])), 90.5*sin(radians(d[i])),
+                    '%d'%ii,
+                    rotation=d[i]-90,
+                    fontsize=font_size*2/3.,
+                    horizontalalignment='center',
+                    verticalalignment='center',
+                    color=clr)
+
+        d = offset - sgn*.5
+        if flipped and offset==0:
+            vernier = 'A'
+        elif flipped and offset==90:
+            vernier = 'X'
+        elif not flipped and offset==0:
+            vernier = 'B'
+        elif not flipped and offset==90:
+            vernier = 'Y'
+
+        ax.text(90.5*cos(radians(d)), 90.5*sin(radians(d)),
+                vernier,
+                rotation=d-90,
+                fontsize=font_size,
+                horizontalalignment='center',
+                verticalalignment='center',
+                color=clr)
+
+    render.draw_segments(ax,concatenate(segs),clr)
+    render.draw_segments(ax,concatenate(marks),clr,1)
+
+
+def outer_ticks(ax,clr):
+    render.draw_segments(ax,degree_ticks(0,90),clr)
+
+def draw_ticks(ax, outside_ticks, flipped, styles, blk_step):
+    is_line_diagram = styles[0]['marker'] == '-'
+
+    color=styles[0]['color']
+    if outside_ticks:
+        verniers(ax,color,flipped)
+    else:
+        outer_ticks(ax,color)
+
+    D0 = angle_range(0, 90, tier_steps(blk_step)[0])
+    for d0 in D0:
+        d1 = radians(d0)
+        dx = cos(d1)
+        dy = sin(d1)
+        xp = 90*dx
+        yp = 90*dy
+
+        # position and angle for text label
+        xtxt = xp + 6*dx
+        ytxt = yp + 6*dy
+        a = d0-90
+        if flipped:
+            d0 = 90-d0
+
+        if is_line_diagram:
+            txt = '%g'%d0
+        else:
+            txt = '%g\n%g'%(90-d0,d0)
+
+        ax.text(xtxt,ytxt,txt,
+                horizontalalignment='center',
+                verticalalignment='center',
+                fontsize=font_size,
+                color=color,
+                rotation=a)
+
+
+#############################################################################
+# horizontal axis
+def hor_axis(ax,flipped,styles):
+    color=styles[0]['color']
+    T = range(0,90+5,5)
+    for t in T:
+        if flipped:
+            t1 = 90-t
+        else:
+            t1 = t
+        if t==90:
+            txt='%d'%t1
+        else:
+            txt='%d\n%d'%(t1,180-t1)
+        ax.text(90-t,-4,txt,
+                horizontalalignment='center',
+                verticalalignment='center',
+                multialignment='center',
+                fontsize=font_size,
+                bbox=dict(facecolor=(1,1,1,.5),edgecolor=(1,1,1,.5),pad=0),
+                color=color)
+    render.draw_segments(ax,axis_ticks(T,0,tick_lengths(T,-2,-1)),color)
+
+
+#############################################################################
+# vertical axis
+def ver_axis(ax,flipped,styles):
+    color=styles[0]['color']
+    T = range(0,90+5,5)
+    for t in T:
+        if flipped:
+            t1 = 90-t
+        else:
+            t1 = t
+        txt='%d'%t1
+        ax.text(-4,t,txt,
+                horizontalalignment='center',
+                verticalalignment='center',
+                multialignment='center',
+                fontsize=font_size,
+                bbox=dict(facecolor=(1,1,1,.5),edgecolor=(1,1,1,.5),pad=0),
+                color=color)
+    render.draw_segments(ax,axis_ticks(T,tick_lengths(T,-2,-1),0,vertical=True),
+                         color)
+
+
+#############################################################################
+# Format axes
+def format_axes(ax):
+    render.format_axes(ax, (-4,98,-4,98))
+
+
+#############################################################################
+# title, date, comments
+def comments(ax,styles):
+    txt = ('Brown-Nassau\nSpherical Computer\n' +
+           datetime.date.today().isoformat() + ' HJO')
+    ax.text(80,80,txt,
+            horizontalalignment='center',
+            verticalalignment='center',
+            multialignment='center',
+            fontsize=font_size,
+            color=styles[0]['color'])
+
+
+#############################################################################
+# save
+def diagram_name(styles, flipped):
+    if styles[0]['marker'] == '-':
+        name = 'lines'
+    else:
+        name = 'dots'
+
+    if flipped:
+        name = name + '2'
+    else:
+        name = name + '1'
+
+    return '_brown_nassau_' + name
+
+def save_diagram(fig, styles, flipped, dire=dire, formats=('svg','pdf'),
+                 workers=None):
+    return render.save(fig, dire, diagram_name(styles, flipped), formats,
+                       workers)
+
+
+#############################################################################
+# draw whole diagram, returns the figure
+def draw(styles, step, blk_step, flipped, batched=True,
+         simplification=simplification, backend=backend, density=density,
+         chunk=chunk, min_gap=min_gap, heatmap=heatmap):
+    check_tiers(styles, blk_step)
+    fig, ax = render.new_axes(backend)
+    with profiling.stage('format_axes', fig):
+        format_axes(ax)
+    if heatmap is not None:
+        with profiling.stage('heatmap', fig):
+            render.draw_heatmap(ax, heatmap, 'quarter', flipped)
+    with profiling.stage('draw_grid', fig):
+        draw_grid(ax, styles, step, blk_step, flipped, batched, simplification,
+                  density, chunk, min_gap)
+    with profiling.stage('draw_ticks', fig):
+        draw_ticks(ax, styles[0]['marker'] == '-', flipped, styles, blk_step)
+    with profiling.stage('hor_axis', fig):
+        hor_axis(ax, flipped, styles)
+    with profiling.stage('ver_axis', fig):
+        ver_axis(ax, flipped, styles)
+    with profiling.stage('comments', fig):
+        comments(ax, styles)
+    with profiling.stage('fix_page', fig):
+        render.fix_page(fig)
+    return fig
+
+# create and save whole diagram
+#
+# formats as in export.py, e.g. ['svg', 'pdf', ('png', 600)], raster
+# formats with backend='matplotlib'
+def create(styles, step, blk_step, flipped, dire=dire, formats=('svg','pdf'),
+           workers=None, simplification=simplification, backend=backend,
+           density=density, chunk=chunk, min_gap=min_gap, heatmap=heatmap):
+    with profiling.diagram(diagram_name(styles, flipped)):
+        fig = draw(styles, step, blk_step, flipped,
+                   simplification=simplification, backend=backend,
+                   density=density, chunk=chunk, min_gap=min_gap,
+                   heatmap=heatmap)
+        save_diagram(fig, styles, flipped, dire, formats, workers)
+    return fig
+
+
+#############################################################################
+# Lines or dots on 'step' intervals, those on 'blk_step' intervals
+# are made darker or thicker
+#
+# Both may be fractional, e.g. step=.5 for large rotors, and blk_step
+# may be a sequence of intervals, coarsest first, with a style for each
+# and one for the rest (see geometry.tier()). The labels are on the
+# first blk_step interval.
+step=1
+blk_step=5
+
+# line diagrams
+line_styles = [
+    {'marker':'-', 'color': (0,0,0), 'width':.5, 'size':2},
+    {'marker':'-', 'color': (0,0,0), 'width':.2, 'size':.25}
+]
+
+# dot diagram
+dot_styles = [
+    {'marker':'.', 'color': (0,0,0), 'width':.5, 'size':2},
+    {'marker':'.', 'color': (0,0,0), 'width':.2, 'size':.25}
+]
+
+def main():
+    # two line diagrams, original and flipped
+    create(line_styles, step, blk_step, False)
+    create(line_styles, step, blk_step, True)
+
+    # dot diagram
+    create(dot_styles, step, blk_step, False)
+
+if __name__ == '__main__':
+    render.log_to_stdout()
+    main()
@@ -0,0 +1,298 @@
+# Copyright 2014 Harri Ojanen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# brown_nassau_semi.py
+#
+# Creates semi-circle variants of the diagrams for the base and a single
+# rotor of a Brown-Nassau spherical computer.
+#
+# The base and rotor are larger than in the original computer, but
+# there are fewer cases to consider ("same name" or not ...)
+#
+# Run as
+#   python -m navigation.diagrams.brown_nassau_semi
+# or call create().
+#
+
+from numpy import *
+import datetime
+
+from .cache import grid_chunks, grid_dots
+from .geometry import angle_range, check_tiers, tier_steps
+from .scales import *
+from . import profiling, render
+
+font_size=3
+
+# default output directory
+dire = '/home/harri/mac/'
+
+# polyline simplification of the grid lines in points, None to draw
+# every computed vertex (see simplify.py)
+simplification = {'tol': .05, 'grid': .01}
+
+# 'native' writes svg and pdf directly (see vector.py), 'matplotlib' is
+# the reference and also writes raster formats
+backend = 'native'
+
+# samples per degree along the grid curves, and the number of curves
+# computed and drawn at a time, None for the whole grid at once from the
+# cache (see geometry.iter_grid_curves())
+density = 1
+chunk = None
+
+# thinning of the grid near the pole: None for the fixed rules of
+# geometry.ellipse_span(), or the least distance in points between
+# neighbouring curves of a tier, and dots along the lines of a dot
+# diagram, measured from the scale factors of the projection (see
+# geometry.grid_scales()). density='auto' likewise samples the curves
+# for segments of at most max_segment points.
+min_gap = None
+max_segment = 1.
+
+# a scale of geometry.SCALES drawn as a heat map under the grid, e.g.
+# 'ellipse_gap', or None; backend='matplotlib' only
+heatmap = None
+
+
+#############################################################################
+# draw the brown nassau grid
+
+def draw_grid(ax, styles, step, blk_step, flipped, batched=True,
+              simplification=None, density=density, chunk=chunk,
+              min_gap=min_gap):
+    density, min_gap = render.grid_units(ax, 'semi', density, min_gap,
+                                         max_segment)
+    is_line_diagram = styles[0]['marker'] == '-'
+    if is_line_diagram or not batched:
+        chunks = grid_chunks(step, blk_step, flipped, 'semi',
+                             not is_line_diagram, density, chunk, min_gap)
+    else:
+        chunks = [grid_dots(step, blk_step, flipped, 'semi', density=density,
+                            min_gap=min_gap)]
+    if not is_line_diagram:
+        simplification = None
+    render.draw_chunks(ax, chunks, styles, batched, simplification, 'grid')
+
+
+#############################################################################
+# tick marks, labels and verniers for arc
+def verniers(ax,clr):
+    segs = []
+    marks = []
+    for offset in [0,90,-90]:
+        for sgn in [-1,1]:
+            d, r = vernier_angles(offset, sgn)
+            segs.append(vernier_ticks(offset, sgn))
+            for i in [10,20,30]:
+                ax.text(90.5*cos(radians(d[i])), 90.5*sin(radians(d[i])),
+                        '%d'%i,
+                        rotation=d[i]-90,
+                        fontsize=font_size*2/3.,
+                        horizontalalignment='center',
+                        verticalalignment='center',
+                        color=clr)
+
+        marks.append(arc_ticks(radians([offset]),90.5,91))
+
+    render.draw_segments(ax,concatenate(segs),clr)
+    render.draw_segments(ax,concatenate(marks),clr,1)
+
+def outer_ticks(ax,clr):
+    render.draw_segments(ax,degree_ticks(-90,90),clr)
+
+def draw_ticks(ax, outside_ticks, flipped, blk_step):
+    if outside_ticks:
+        outer_ticks(ax,'w')
+        verniers(ax,'k')
+    else:
+        outer_ticks(ax,'k')
+        verniers(ax,'w')
+
+    D0 = angle_range(-90, 90, tier_steps(blk_step)[0])
+    for d0 in D0:
+        d1 = radians(d0)
+        dx = cos(d1)
+        dy = sin(d1)
+        xp = 90*dx
+        yp = 90*dy
+
+        # position and angle for text label
+        xtxt = xp + 5*dx
+        ytxt = yp + 5*dy
+        a = d0-90
+        if flipped:
+            a = 180+a
+
+        ax.text(xtxt,ytxt,'%g'%d0,
+                horizontalalignment='center',
+                verticalalignment='center',
+                fontsize=font_size,
+                color='k',
+                rotation=a)
+
+
+#############################################################################
+# horizontal axis
+def hor_axis(ax):
+    T = range(0,90,10)
+    for t in T:
+        if t%90==0:
+            txt='%d'%t
+        else:
+            txt='%d\n%d'%(t,180-t)
+        ax.text(90-t,0,txt,
+                horizontalalignment='center',
+                verticalalignment='center',
+                multialignment='center',
+                fontsize=font_size,
+                bbox=dict(facecolor=(1,1,1,.5),edgecolor=(1,1,1,.5),pad=0),
+                color='k')
+
+#############################################################################
+# vertical axis
+def ver_axis(ax):
+    T = range(-90,90+5,5)
+    for t in T:
+        txt='%d'%t
+        ax.text(-4,t,txt,
+                horizontalalignment='center',
+                verticalalignment='center',
+                multialignment='center',
+                fontsize=font_size,
+                bbox=dict(facecolor=(1,1,1,.5),edgecolor=(1,1,1,.5),pad=0),
+                color='k')
+    render.draw_segments(ax,axis_ticks(T,tick_lengths(T,-2,-1),0,vertical=True),
+                         'k')
+
+
+#############################################################################
+# Format axes
+def format_axes(ax):
+    render.format_axes(ax, (-25,94,-94,94))
+
+
+#############################################################################
+# title, date, comments
+def comments(ax):
+    txt = ('Brown-Nassau\nSpherical Computer\n' +
+           datetime.date.today().isoformat() + ' HJO')
+    ax.text(80,80,txt,
+            horizontalalignment='center',
+            verticalalignment='center',
+            multialignment='center',
+            fontsize=font_size,
+            color='k')
+
+
+
+#############################################################################
+# save
+def diagram_name(styles, flipped):
+    if styles[0]['marker'] == '-':
+        name = 'lines'
+    else:
+        name = 'dots'
+
+    if flipped:
+        name = name + '2'
+    else:
+        name = name + '1'
+
+    return '_brown_nassau_semi_' + name
+
+def save_diagram(fig, styles, flipped, dire=dire, formats=('svg','pdf'),
+                 workers=None):
+    return render.save(fig, dire, diagram_name(styles, flipped), formats,
+                       workers)
+
+
+#############################################################################
+# draw whole diagram, returns the figure
+def draw(styles, step, blk_step, flipped, batched=True,
+         simplification=simplification, backend=backend, density=density,
+         chunk=chunk, min_gap=min_gap, heatmap=heatmap):
+    check_tiers(styles, blk_step)
+    fig, ax = render.new_axes(backend)
+    with profiling.stage('format_axes', fig):
+        format_axes(ax)
+    if heatmap is not None:
+        with profiling.stage('heatmap', fig):
+            render.draw_heatmap(ax, heatmap, 'semi', flipped)
+    with profiling.stage('draw_grid', fig):
+        draw_grid(ax, styles, step, blk_step, flipped, batched, simplification,
+                  density, chunk, min_gap)
+    with profiling.stage('draw_ticks', fig):
+        draw_ticks(ax, styles[0]['marker'] == '-', flipped, blk_step)
+    with profiling.stage('hor_axis', fig):
+        hor_axis(ax)
+    with profiling.stage('ver_axis', fig):
+        ver_axis(ax)
+    with profiling.stage('comments', fig):
+        comments(ax)
+    with profiling.stage('fix_page', fig):
+        render.fix_page(fig)
+    return fig
+
+# create and save whole diagram
+#
+# formats as in export.py, e.g. ['svg', 'pdf', ('png', 600)], raster
+# formats with backend='matplotlib'
+def create(styles, step, blk_step, flipped, dire=dire, formats=('svg','pdf'),
+           workers=None, simplification=simplification, backend=backend,
+           density=density, chunk=chunk, min_gap=min_gap, heatmap=heatmap):
+    with profiling.diagram(diagram_name(styles, flipped)):
+        fig = draw(styles, step, blk_step, flipped,
+                   simplification=simplification, backend=backend,
+                   density=density, chunk=chunk, min_gap=min_gap,
+                   heatmap=heatmap)
+        save_diagram(fig, styles, flipped, dire, formats, workers)
+    return fig
+
+
+#############################################################################
+# Lines or dots on 'step' intervals, those on 'blk_step' intervals
+# are made darker or thicker or whatever depending on the above styles
+#
+# Both may be fractional, e.g. step=.5 for large rotors, and blk_step
+# may be a sequence of intervals, coarsest first, with a style for each
+# and one for the rest (see geometry.tier()). The labels are on the
+# first blk_step interval.
+step=1
+blk_step=5
+
+
+#############################################################################
+# Alternative styles
+
+# lines
+line_styles = [
+    {'marker':'-', 'color': (0,0,1), 'width':.25, 'size':1},
+    {'marker':'-', 'color': (0,0,1), 'width':.1, 'size':.125}
+]
+
+# dots
+dot_styles = [
+    {'marker':'.', 'color': (0,0,0), 'width':.25, 'size':1},
+    {'marker':'.', 'color': (0,0,0), 'width':.1, 'size':.125}
+]
+
+def main():
+    create(line_styles, step, blk_step, False)
+    create(dot_styles, step, blk_step, False)
+
+if __name__ == '__main__':
+    render.log_to_stdout()
+    main()
@@ -0,0 +1,238 @@
+# Copyright 2014 Harri Ojanen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# cache.py
+#
+# Persistent cache for computed curve families.
+#
+# A family is a list of groups (e.g. style tiers), each a list of (x,y)
+# curves. It is stored under a key made from the name of the family,
+# its generating parameters and a hash of geometry.py, nomogram.py and
+# sampling.py, so that any change in the formulae invalidates the
+# cache. Each entry is a directory with three .npy files:
+#
+#   xy.npy       all vertices, shape (2,N)
+#   lengths.npy  number of vertices of each curve
+#   groups.npy   group of each curve
+#
+# of which xy is memory-mapped on load, the curves being views into it.
+# Entries are evicted least recently used first when the cache grows
+# over max_bytes.
+#
+# The cache lives in $NAVIGATION_CACHE_DIR, or by default in
+# $XDG_CACHE_HOME/navigation/geometry (~/.cache/...). Set 'enabled' to
+# False to always recompute.
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from numpy import array, cumsum, empty, int64, load, save
+
+from . import geometry, nomogram, sampling
+
+enabled = True
+max_bytes = 256*2**20
+
+
+#############################################################################
+# keys
+
+# $XDG_CACHE_HOME/navigation/<name>
+def user_cache_dir(name):
+    base = os.environ.get('XDG_CACHE_HOME',
+                          os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(base, 'navigation', name)
+
+def cache_dir():
+    dire = os.environ.get('NAVIGATION_CACHE_DIR')
+    if dire is None:
+        dire = user_cache_dir('geometry')
+    return dire
+
+_code_version = None
+
+def code_version():
+    global _code_version
+    if _code_version is None:
+        h = hashlib.sha1()
+        for module in (geometry, nomogram, sampling):
+            with open(os.path.splitext(module.__file__)[0] + '.py', 'rb') as f:
+                h.update(f.read())
+        _code_version = h.hexdigest()
+    return _code_version
+
+def cache_key(name, params):
+    txt = json.dumps({'name': name, 'params': params,
+                      'version': code_version()}, sort_keys=True)
+    return name + '-' + hashlib.sha1(txt.encode('utf-8')).hexdigest()[:20]
+
+
+#############################################################################
+# packing a family into flat arrays and back
+
+def pack(family):
+    curves = [(x, y) for g in family for (x, y) in g]
+    lengths = array([len(x) for (x, y) in curves], dtype=int64)
+    groups = array([i for i in range(len(family)) for c in family[i]],
+                   dtype=int64)
+    xy = empty((2, lengths.sum()))
+    i = 0
+    for (x, y), n in zip(curves, lengths):
+        xy[0, i:i+n] = x
+        xy[1, i:i+n] = y
+        i += n
+    return xy, lengths, groups
+
+def unpack(xy, lengths, groups, n_groups):
+    family = [[] for i in range(n_groups)]
+    ends = cumsum(lengths)
+    for g, b, n in zip(groups, ends, lengths):
+        family[g].append((xy[0, b-n:b], xy[1, b-n:b]))
+    return family
+
+
+#############################################################################
+# storage
+
+def entry_size(path):
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+def load_entry(key, n_groups):
+    path = os.path.join(cache_dir(), key)
+    try:
+        xy = load(os.path.join(path, 'xy.npy'), mmap_mode='r')
+        lengths = load(os.path.join(path, 'lengths.npy'))
+        groups = load(os.path.join(path, 'groups.npy'))
+    except (IOError, OSError, ValueError):
+        return None
+    os.utime(path, None)
+    return unpack(xy, lengths, groups, n_groups)
+
+def store_entry(key, family):
+    dire = cache_dir()
+    if not os.path.isdir(dire):
+        os.makedirs(dire)
+    xy, lengths, groups = pack(family)
+
+    # write into a temporary directory and rename, concurrent writers
+    # of the same entry then simply lose the race
+    tmp = tempfile.mkdtemp(dir=dire, prefix='.tmp-')
+    save(os.path.join(tmp, 'xy.npy'), xy)
+    save(os.path.join(tmp, 'lengths.npy'), lengths)
+    save(os.path.join(tmp, 'groups.npy'), groups)
+    try:
+        os.rename(tmp, os.path.join(dire, key))
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+    evict()
+
+# remove least recently used entries, directories or files by their
+# modification time, until the cache in 'dire' fits in 'limit' bytes
+def evict(limit=None, dire=None):
+    if limit is None:
+        limit = max_bytes
+    if dire is None:
+        dire = cache_dir()
+    if not os.path.isdir(dire):
+        return
+    entries = []
+    for name in os.listdir(dire):
+        path = os.path.join(dire, name)
+        if name.startswith('.'):
+            continue
+        try:
+            entries.append((os.path.getmtime(path), entry_size(path), path))
+        except OSError:
+            continue
+    entries.sort()
+    total = sum(size for (t, size, path) in entries)
+    for (t, size, path) in entries:
+        if total <= limit:
+            break
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        total -= size
+
+def clear():
+    evict(0)
+
+
+#############################################################################
+# cached families
+
+# family 'name' computed by compute() from 'params', a dict of plain
+# values
+def cached(name, params, compute, n_groups):
+    if not enabled:
+        return compute()
+    key = cache_key(name, params)
+    family = load_entry(key, n_groups)
+    if family is None:
+        family = compute()
+        try:
+            store_entry(key, family)
+        except (IOError, OSError):
+            pass
+    return family
+
+# geometry.grid_curves(), grouped by style tier
+def grid_curves(step, blk_step, flipped, layout='quarter', dots=False,
+                density=1, min_gap=None):
+    params = {'step': step, 'blk_step': blk_step, 'flipped': bool(flipped),
+              'layout': layout, 'dots': bool(dots), 'density': density,
+              'min_gap': min_gap}
+    return cached('grid_curves', params,
+                  lambda: geometry.grid_curves(step, blk_step, flipped,
+                                               layout, dots, density,
+                                               min_gap),
+                  geometry.tier_count(blk_step))
+
+# the grid curves in chunks of 'chunk' curves as computed by
+# geometry.iter_grid_curves(), not cached, or with chunk=None the whole
+# grid as a single chunk from the cache
+def grid_chunks(step, blk_step, flipped, layout='quarter', dots=False,
+                density=1, chunk=None, min_gap=None):
+    if chunk is None:
+        return [grid_curves(step, blk_step, flipped, layout, dots, density,
+                            min_gap)]
+    return geometry.iter_grid_curves(step, blk_step, flipped, layout, dots,
+                                     density, chunk, min_gap)
+
+# geometry.grid_dots(), grouped by style tier
+def grid_dots(step, blk_step, flipped, layout='quarter', tol=1e-6,
+              density=1, min_gap=None):
+    params = {'step': step, 'blk_step': blk_step, 'flipped': bool(flipped),
+              'layout': layout, 'tol': tol, 'density': density,
+              'min_gap': min_gap}
+    return cached('grid_dots', params,
+                  lambda: geometry.grid_dots(step, blk_step, flipped,
+                                             layout, tol, density, min_gap),
+                  geometry.tier_count(blk_step))
+
+# geometry.rust_auxiliary_curves(), a single group in declination order
+def rust_auxiliary_curves(lat_step=.01, tol=None):
+    return cached('rust_auxiliary_curves', {'lat_step': lat_step, 'tol': tol},
+                  lambda: [geometry.rust_auxiliary_curves(lat_step, tol)],
+                  1)[0]
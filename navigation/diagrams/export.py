@@ -0,0 +1,144 @@
+# Copyright 2014 Harri Ojanen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# export.py
+#
+# Render once, export many.
+#
+# savefig(bbox_inches='tight') draws the whole figure once just to
+# find its extent and then again to write the file. Here the tight
+# bounding box is computed once per figure and cached on it, and every
+# format is then written with that box, so a format costs one draw.
+# The diagrams give their page with set_bbox() instead, see layout.py,
+# and skip that draw altogether.
+#
+# Formats are given as 'svg', 'pdf', 'png' or (format, dpi) pairs,
+# e.g. ['svg', 'pdf', ('png', 300), ('png', 1200)]. A raster format
+# given with several resolutions gets the dpi in the file name.
+#
+# With workers > 1 the figure is pickled once and the formats are
+# written in parallel processes, each with its own copy of the figure.
+#
+# A vector.Page is written directly, it needs no bounding box.
+#
+# Rasters too large for one canvas, e.g. posters at 2400 dpi, are
+# written in tiles by tiles.py.
+
+import os.path
+import pickle
+
+from . import profiling
+from .vector import Page
+
+
+#############################################################################
+# formats and file names
+
+def format_spec(fmt):
+    if isinstance(fmt, (tuple, list)):
+        ext, dpi = fmt
+    else:
+        ext, dpi = fmt, None
+    return ext, dpi
+
+def output_paths(dire, file_name, formats):
+    specs = [format_spec(fmt) for fmt in formats]
+    exts = [ext for (ext, dpi) in specs]
+    paths = []
+    for (ext, dpi) in specs:
+        if exts.count(ext) > 1 and dpi is not None:
+            name = '%s_%ddpi.%s' % (file_name, dpi, ext)
+        else:
+            name = '%s.%s' % (file_name, ext)
+        paths.append((os.path.join(dire, name), ext, dpi))
+    return paths
+
+
+def stage_name(ext, dpi):
+    if dpi is None:
+        return 'save ' + ext
+    return 'save %s %ddpi' % (ext, dpi)
+
+
+#############################################################################
+# tight bounding box, computed with a single draw and cached on the figure
+
+def tight_bbox(fig, pad_inches=0.0, refresh=False):
+    cached = getattr(fig, '_export_bbox', None)
+    if cached is not None and cached[0] == pad_inches and not refresh:
+        return cached[1]
+
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    canvas = fig.canvas
+    if not isinstance(canvas, FigureCanvasAgg):
+        canvas = FigureCanvasAgg(fig)
+    renderer = canvas.get_renderer()
+    fig.draw(renderer)
+    bbox = fig.get_tightbbox(renderer).padded(pad_inches)
+
+    fig._export_bbox = (pad_inches, bbox)
+    return bbox
+
+
+# a bounding box known in advance, e.g. from layout.page_bbox(), used
+# in place of the tight one
+def set_bbox(fig, bbox, pad_inches=0.0):
+    fig._export_bbox = (pad_inches, bbox.padded(pad_inches))
+
+
+#############################################################################
+# writers
+
+def write(fig, path, ext, dpi, bbox):
+    kwargs = {}
+    if dpi is not None:
+        kwargs['dpi'] = dpi
+    fig.savefig(path, format=ext, bbox_inches=bbox, **kwargs)
+    return path
+
+def write_pickled(args):
+    from matplotlib.transforms import Bbox
+    data, path, ext, dpi, bounds = args
+    fig = pickle.loads(data)
+    return write(fig, path, ext, dpi, Bbox.from_bounds(*bounds))
+
+# write 'fig' in all 'formats' into dire/file_name.<format>, returns
+# the list of written paths
+def export(fig, dire, file_name, formats=('svg','pdf'), pad_inches=0.0,
+           workers=None):
+    paths = output_paths(dire, file_name, formats)
+    if isinstance(fig, Page):
+        written = []
+        for (path, ext, dpi) in paths:
+            with profiling.stage(stage_name(ext, dpi)):
+                written.append(fig.write(path, ext))
+        return written
+
+    with profiling.stage('bbox'):
+        bbox = tight_bbox(fig, pad_inches)
+
+    if workers is None or workers < 2 or len(paths) < 2:
+        written = []
+        for (path, ext, dpi) in paths:
+            with profiling.stage(stage_name(ext, dpi)):
+                written.append(write(fig, path, ext, dpi, bbox))
+        return written
+
+    from concurrent.futures import ProcessPoolExecutor
+    data = pickle.dumps(fig)
+    jobs = [(data, path, ext, dpi, bbox.bounds) for (path, ext, dpi) in paths]
+    with profiling.stage('save in %d processes' % min(workers, len(jobs))):
+        with ProcessPoolExecutor(min(workers, len(jobs))) as pool:
+            return list(pool.map(write_pickled, jobs))
@@ -0,0 +1,591 @@
+# Copyright 2014 Harri Ojanen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# geometry.py
+#
+# Curve families of the diagrams. Only numpy is needed here, nothing
+# in this module draws anything.
+#
+# Each family is a nomogram spec (see nomogram.py): ellipse_spec() and
+# line_spec() of the Brown-Nassau grid, rust_spec() and
+# rust_auxiliary_spec(), and the curves are evaluated from those.
+
+import threading
+
+from numpy import *
+
+from .nomogram import curves, evaluate, iter_tiers, step_tiers
+
+__all__ = ['LAYOUTS', 'SCALES', 'Workspace', 'brown_nassau',
+           'brown_nassau_jacobian', 'grid_scales', 'scale_field',
+           'is_multiple', 'angle_range', 'tier_steps', 'tier_count',
+           'check_tiers', 'tier',
+           'ellipse_range', 'line_range', 'ellipse_span', 'ellipse_limit',
+           'measured_ellipse_span', 'line_dot_interval', 'auto_density',
+           'ellipse_spec', 'line_spec',
+           'iter_grid_curves', 'grid_curves', 'grid_dots',
+           'prime_vertical_lha', 'prime_vertical_altitude',
+           'prime_vertical_lha_slope', 'rust_auxiliary_gap',
+           'prime_vertical_lat', 'rust_auxiliary_spec',
+           'rust_auxiliary_curve', 'rust_auxiliary_curves',
+           'rust_curve_start', 'rust_curve_point', 'rust_curve_slope',
+           'rust_spec', 'rust_curve']
+
+LAYOUTS = ('quarter', 'semi')
+
+
+#############################################################################
+# Brown-Nassau grid formulae
+#
+# y = sin d, x = cos d cos t
+#
+# d = const: lines parallel to x-axis
+# t = const: ellipses
+#
+# transformation r' = asin r
+#
+# brown_nassau() works in blocks of about 'chunk' points with in-place
+# ufuncs, x and y in the output arrays and the rest in the buffers of a
+# Workspace kept between calls, so that nothing of the size of the
+# result is allocated but the result itself, and not even that when
+# given in 'out' (in the order returned). The sines and cosines of a
+# broadcast argument, e.g. the parameters of a family of curves against
+# the samples along them, are taken once over its own points. The scale
+# s = r'/r is 1 at r = 0, its limit, and r is clipped to 1 where x^2 +
+# y^2 rounds above it at the rim.
+
+transform_chunk = 2**14
+
+# temporaries of brown_nassau(), grown as needed
+class Workspace:
+    def __init__(self, size=0):
+        self.size = 0
+        self.grow(size)
+
+    def grow(self, size):
+        if size > self.size:
+            self.r = empty(size)
+            self.s = empty(size)
+            self.mask = empty(size, dtype=bool)
+            self.size = size
+
+    def buffers(self, shape):
+        n = int(prod(shape))
+        self.grow(n)
+        return [b[:n].reshape(shape) for b in (self.r, self.s, self.mask)]
+
+# one per thread, for calls without a workspace of their own
+_workspaces = threading.local()
+
+def default_workspace():
+    work = getattr(_workspaces, 'work', None)
+    if work is None:
+        work = _workspaces.work = Workspace()
+    return work
+
+# (x,y) -> (xp,yp) in place for a block, r, s and m from the workspace
+def brown_nassau_block(xp, yp, r, s, m):
+    multiply(xp, xp, out=r)
+    multiply(yp, yp, out=s)
+    r += s
+    sqrt(r, out=r)
+    minimum(r, 1., out=r)
+    arcsin(r, out=s)
+    greater(r, 0., out=m)
+    divide(s, r, out=s, where=m)
+    logical_not(m, out=m)
+    copyto(s, 1., where=m)
+    xp *= s
+    yp *= s
+
+# a broadcast against 'shape' as (rows, columns), keeping axes of length
+# 1; beyond two dimensions broadcast in full
+def as_2d(a, shape):
+    if len(shape) > 2:
+        return broadcast_to(a, shape).reshape(-1, shape[-1])
+    return a.reshape((1,)*(2 - a.ndim) + a.shape)
+
+# the part of a in the block b of the result
+def block_part(a, b):
+    return a[tuple([b[k] if a.shape[k] > 1 else slice(None)
+                    for k in (0, 1)])]
+
+def output_arrays(out, shape, flipped):
+    if out is None:
+        return empty(shape), empty(shape)
+    xp, yp = out[::-1] if flipped else out
+    if xp.shape != shape or yp.shape != shape:
+        raise ValueError('output arrays must have shape %s' % (shape,))
+    if not (xp.flags.c_contiguous and yp.flags.c_contiguous):
+        raise ValueError('output arrays must be contiguous')
+    return xp, yp
+
+def brown_nassau(d, t, flipped=False, out=None, work=None, chunk=None):
+    d = asarray(d, dtype=float)
+    t = asarray(t, dtype=float)
+    shape = broadcast_shapes(d.shape, t.shape)
+    xp, yp = output_arrays(out, shape, flipped)
+    if any([may_share_memory(o, a) for o in (xp, yp) for a in (d, t)]):
+        raise ValueError('output arrays must not overlap the inputs')
+    if work is None:
+        work = default_workspace()
+    if chunk is None:
+        chunk = transform_chunk
+
+    if xp.size:
+        X = xp.reshape(as_2d(xp, shape).shape)
+        Y = yp.reshape(X.shape)
+        d = as_2d(d, shape)
+        t = as_2d(t, shape)
+        cd = sd = ct = None
+        if d.size < X.size:
+            cd, sd = cos(d), sin(d)
+        if t.size < X.size:
+            ct = cos(t)
+
+        rows, cols = X.shape
+        width = int(minimum(cols, chunk))
+        height = int(maximum(1, chunk // width))
+        for i in range(0, rows, height):
+            for j in range(0, cols, width):
+                b = (slice(i, i + height), slice(j, j + width))
+                x, y = X[b], Y[b]
+                r, s, m = work.buffers(x.shape)
+                # x = cos d cos t, y = sin d
+                if cd is None:
+                    cos(block_part(d, b), out=x)
+                    sin(block_part(d, b), out=y)
+                else:
+                    copyto(x, block_part(cd, b))
+                    copyto(y, block_part(sd, b))
+                if ct is None:
+                    x *= cos(block_part(t, b), out=r)
+                else:
+                    x *= block_part(ct, b)
+                brown_nassau_block(x, y, r, s, m)
+
+    if out is None and xp.ndim == 0:
+        xp, yp = xp[()], yp[()]
+    if flipped:
+        return (yp,xp)
+    else:
+        return (xp,yp)
+
+# whether the angle v is a multiple of m, for real valued angles
+def is_multiple(v, m, tol=1e-9):
+    q = v/m
+    return abs(q - round(q)) < tol
+
+# angles start, start+step, ... up to stop, for real valued steps too
+def angle_range(start, stop, step):
+    n = int(floor((stop - start)/step + 1e-9))
+    return around(start + arange(n+1)*step, 9)
+
+# intervals of the style tiers, coarsest first: 'blk_step' is a single
+# interval or a sequence of them, e.g. (10, 5, 1)
+def tier_steps(blk_step):
+    return [m for m in atleast_1d(blk_step)]
+
+def tier_count(blk_step):
+    return len(tier_steps(blk_step)) + 1
+
+# raises ValueError unless there is a style for each tier of 'blk_step'
+def check_tiers(styles, blk_step):
+    if len(styles) < tier_count(blk_step):
+        raise ValueError('blk_step %s makes %d style tiers, but there are '
+                         'only %d styles'
+                         % (','.join(['%g' % m for m in tier_steps(blk_step)]),
+                            tier_count(blk_step), len(styles)))
+
+# style tier of curve k: the first of the 'blk_step' intervals k is on,
+# and the last tier for the rest. With a single interval that is 0 for
+# the curves on 'blk_step' intervals and 1 for the rest.
+def tier(k, blk_step):
+    steps = tier_steps(blk_step)
+    for s in range(len(steps)):
+        if is_multiple(k, steps[s]):
+            return s
+    return len(steps)
+
+
+#############################################################################
+# scale distortion of the Brown-Nassau grid
+#
+# The Jacobian of brown_nassau() with respect to (d,t). With v = (x,y),
+# z = cos d sin t = sqrt(1 - r^2) and r' = atan2(r, z) = asin r,
+#
+#   dP/du = (r'/r) dv/du - v (r - z r')/r^3 dz/du
+#
+# which stays finite on the rim r = 1, and near the centre r = 0 the
+# factor (r - z r')/r^3 is taken from its series 1/3 + 2r^2/15.
+#
+# grid_scales() gives the measures of the grid at (d,t), in plot units
+# per degree as the plot is in degrees:
+#
+#   h_d, h_t      length of the ellipse and line tangents, the spacing
+#                 of points along them
+#   area          |det J|, the area scale
+#   ellipse_gap   distance between neighbouring ellipses, area/h_d
+#   line_gap      distance between neighbouring lines, area/h_t
+#   gap           the smaller of the two
+#   angle         angle between the ellipse and the line, degrees
+#
+# Near the pole the ellipses converge and ellipse_gap goes to zero,
+# which is what ellipse_limit() measures to end them.
+
+SCALES = ('h_d', 'h_t', 'area', 'ellipse_gap', 'line_gap', 'gap', 'angle')
+
+# (dx'/dd, dx'/dt, dy'/dd, dy'/dt), all in radians
+def brown_nassau_jacobian(d, t, flipped=False):
+    d, t = broadcast_arrays(asarray(d, dtype=float), asarray(t, dtype=float))
+    sd = sin(d)
+    cd = cos(d)
+    st = sin(t)
+    ct = cos(t)
+    x = cd*ct
+    y = sd
+    z = cd*st
+    r = hypot(x, y)
+    rp = arctan2(r, z)
+    rs = where(r > 0, r, 1.)
+    g = where(r > 0, rp/rs, 1.)
+    w = where(r < 1e-2, 1/3. + 2*r**2/15., (r - z*rp)/rs**3)
+    zd = -sd*st
+    zt = cd*ct
+    xd = g*(-sd*ct) - x*w*zd
+    xt = g*(-cd*st) - x*w*zt
+    yd = g*cd - y*w*zd
+    yt = -y*w*zt
+    if flipped:
+        return (yd, yt, xd, xt)
+    else:
+        return (xd, xt, yd, yt)
+
+# the measures above at (d,t) in degrees, as a dict of arrays
+def grid_scales(d, t):
+    xd, xt, yd, yt = brown_nassau_jacobian(radians(d), radians(t))
+    h_d = hypot(xd, yd)
+    h_t = hypot(xt, yt)
+    area = abs(xd*yt - xt*yd)
+    with errstate(divide='ignore', invalid='ignore'):
+        ellipse_gap = where(h_d > 0, area/h_d, nan)
+        line_gap = where(h_t > 0, area/h_t, nan)
+        angle = degrees(arcsin(clip(area/(h_d*h_t), 0, 1)))
+    return {'h_d': h_d, 'h_t': h_t, 'area': area,
+            'ellipse_gap': ellipse_gap, 'line_gap': line_gap,
+            'gap': fmin(ellipse_gap, line_gap), 'angle': angle}
+
+# the scale 'name' over the (d,t) domain of the layout, n x n samples,
+# with their positions in plot units, for a heat map
+def scale_field(name, layout='quarter', flipped=False, n=256):
+    if name not in SCALES:
+        raise ValueError('unknown scale %r, expected one of %s'
+                         % (name, ', '.join(SCALES)))
+    check_layout(layout)
+    d = linspace(0 if layout == 'quarter' else -90, 90, n)
+    t = linspace(0, 90, n)
+    D, T = meshgrid(d, t, indexing='ij')
+    xp, yp = grid_map(D, T, flipped)
+    return xp, yp, grid_scales(D, T)[name]
+
+
+#############################################################################
+# the brown nassau grid
+#
+# layout 'quarter' is the base and rotors of the original computer,
+# 'semi' the larger semi-circle variant. Steps and intervals are in
+# degrees and may be fractional; 'density' is the number of samples per
+# degree along the curves.
+
+def check_layout(layout):
+    if layout not in LAYOUTS:
+        raise ValueError('unknown layout %r, expected one of %s'
+                         % (layout, ', '.join(LAYOUTS)))
+
+# first and last declination (degrees) of the equal azimuth ellipses
+# t0, the ellipses are shortened near the pole depending on t0, those
+# between whole degrees the most
+def ellipse_span(t0, layout='quarter'):
+    check_layout(layout)
+    d1 = select([is_multiple(t0, 10), is_multiple(t0, 5),
+                 is_multiple(t0 - 2, 5), is_multiple(t0, 1)],
+                [90, 85, 80, 70], 60)
+    if layout == 'quarter':
+        return zeros(shape(d1), dtype=int), d1
+    else:
+        return where(d1 == 80, -79, -d1), where(d1 == 80, 79, d1)
+
+# declinations along the ellipse t0
+def ellipse_range(t0, layout='quarter', density=1):
+    d0, d1 = ellipse_span(t0, layout)
+    return angle_range(d0, d1, 1./density)
+
+# declinations of the equal altitude lines
+def line_range(step, layout='quarter'):
+    check_layout(layout)
+    if layout == 'quarter':
+        return angle_range(0, 90, step)
+    else:
+        return angle_range(-90, 90, step)
+
+# interval between the curves of each tier: the blk_step intervals
+# and 'step' for the last tier
+def tier_intervals(step, blk_step):
+    return array(tier_steps(blk_step) + [step], dtype=float)
+
+# last declination of the ellipses t0, sampled every 1/density degrees
+# from the equator up, before they come closer than min_gap plot units
+# to their neighbours 'interval' degrees away
+def ellipse_limit(t0, interval, min_gap, density=1):
+    t0 = asarray(t0, dtype=float)
+    interval = broadcast_to(interval, shape(t0)).ravel()
+    d = angle_range(0, 90, 1./density)
+    gap = grid_scales(d[newaxis,:], t0.ravel()[:,newaxis])['ellipse_gap']
+    crowded = ~(gap*interval[:,newaxis] >= min_gap)
+    first = where(crowded.any(axis=1), crowded.argmax(axis=1), len(d))
+    return d[maximum(first - 1, 0)].reshape(shape(t0))
+
+# the span of the ellipses t0 by measured crowding in place of the
+# fixed rules of ellipse_span(): each tier ends where its curves come
+# closer than min_gap plot units, which is where the finer tiers have
+# already ended, and the first tier runs up to the pole
+def measured_ellipse_span(t0, step, blk_step, min_gap, layout='quarter',
+                          density=1):
+    check_layout(layout)
+    t0 = asarray(t0, dtype=float)
+    k = step_tiers(tier_steps(blk_step))(t0)
+    d1 = where(k == 0, 90.,
+               ellipse_limit(t0, tier_intervals(step, blk_step)[k], min_gap,
+                             density))
+    if layout == 'quarter':
+        return zeros(shape(d1)), d1
+    else:
+        return -d1, d1
+
+# interval of the dots along the lines d0 of a dot diagram: the finest
+# tier interval at which neighbouring dots stay min_gap plot units
+# apart everywhere along the line, or the coarsest one
+def line_dot_interval(d0, step, blk_step, min_gap, density=1):
+    d0 = asarray(d0, dtype=float)
+    t = angle_range(0, 90, 1./density)
+    h = grid_scales(d0.ravel()[:,newaxis], t[newaxis,:])['h_t'].min(axis=1)
+    intervals = sort(tier_intervals(step, blk_step))
+    m = full(len(h), intervals[-1])
+    for c in intervals[::-1]:
+        m = where(h*c >= min_gap, c, m)
+    return m.reshape(shape(d0))
+
+# samples per degree along the grid curves for segments of at most
+# max_seg plot units, from the largest of h_d and h_t over the layout
+def auto_density(max_seg, layout='quarter', n=181):
+    h = [scale_field(name, layout, n=n)[2] for name in ('h_d', 'h_t')]
+    return int(maximum(1, ceil(nanmax(fmax(*h))/max_seg)))
+
+def grid_map(d, t, flipped):
+    xp, yp = brown_nassau(radians(d), radians(t), flipped)
+    return degrees(xp, out=xp), degrees(yp, out=yp)
+
+# equal azimuth ellipses, each the part of the longest one within its
+# span, by the fixed rules or, given min_gap in plot units, by measured
+# crowding
+def ellipse_spec(step, blk_step, flipped, layout='quarter', density=1,
+                 min_gap=None):
+    def keep(t0, d):
+        if min_gap is None:
+            d0, d1 = ellipse_span(t0, layout)
+        else:
+            d0, d1 = measured_ellipse_span(t0, step, blk_step, min_gap,
+                                           layout, density)
+        return (d >= d0 - 1e-9) & (d <= d1 + 1e-9)
+    return {'params': angle_range(0, 90, step),
+            'map': lambda t0, d: grid_map(d, t0, flipped),
+            'samples': ellipse_range(0, layout, density),
+            'keep': keep,
+            'tier': step_tiers(tier_steps(blk_step)),
+            'tiers': tier_count(blk_step)}
+
+# equal altitude "lines", in a dot diagram those near the pole get a
+# dot only every 5 degrees, or given min_gap as line_dot_interval()
+def line_spec(step, blk_step, flipped, layout='quarter', dots=False,
+              density=1, min_gap=None):
+    spec = {'params': line_range(step, layout),
+            'map': lambda d0, t: grid_map(d0, t, flipped),
+            'samples': angle_range(0, 90, 1./density),
+            'tier': step_tiers(tier_steps(blk_step)),
+            'tiers': tier_count(blk_step)}
+    if dots and min_gap is None:
+        spec['keep'] = lambda d0, t: (abs(d0) < 80) | is_multiple(t, 5)
+    elif dots:
+        spec['keep'] = lambda d0, t: is_multiple(
+            t, line_dot_interval(d0, step, blk_step, min_gap, density))
+    return spec
+
+# the curves of grid_curves() in chunks of at most 'chunk' curves, each
+# chunk a list of tiers as grid_curves() returns. The curves of a chunk
+# are computed together on one 2-D array, so memory is bounded by the
+# chunk size whatever the step and density; the curves are views into
+# that array.
+def iter_grid_curves(step, blk_step, flipped, layout='quarter', dots=False,
+                     density=1, chunk=256, min_gap=None):
+    check_layout(layout)
+    for tiers in iter_tiers(ellipse_spec(step, blk_step, flipped, layout,
+                                         density, min_gap), chunk):
+        yield tiers
+    for tiers in iter_tiers(line_spec(step, blk_step, flipped, layout, dots,
+                                      density, min_gap), chunk):
+        yield tiers
+
+# all curves of the grid in plot units (degrees), grouped by style tier:
+# tiers[s] is a list of (x,y) arrays. In a dot diagram the lines near
+# the pole get a dot only every 5 degrees. Given min_gap in plot units
+# the ellipses end, and the dots thin out, by measured crowding instead.
+def grid_curves(step, blk_step, flipped, layout='quarter', dots=False,
+                density=1, min_gap=None):
+    tiers = [[] for s in range(tier_count(blk_step))]
+    for chunk in iter_grid_curves(step, blk_step, flipped, layout, dots,
+                                  density, min_gap=min_gap):
+        for s in range(len(tiers)):
+            tiers[s] += chunk[s]
+    return tiers
+
+# dots of a dot diagram, each once: the vertices of grid_curves() are
+# rounded to multiples of tol (degrees) and a dot is dropped when the
+# same or an earlier tier already has one there, tiers[s] is a single
+# (x,y) in the original order
+def grid_dots(step, blk_step, flipped, layout='quarter', tol=1e-6,
+              density=1, min_gap=None):
+    tiers = grid_curves(step, blk_step, flipped, layout, True, density,
+                        min_gap)
+    seen = zeros(0, dtype=int64)
+    dots = []
+    for curves in tiers:
+        x = concatenate([x for (x,y) in curves] + [zeros(0)])
+        y = concatenate([y for (x,y) in curves] + [zeros(0)])
+        keys = rint(x/tol).astype(int64)*2**32 + rint(y/tol).astype(int64)
+        keys, i = unique(keys, return_index=True)
+        new = ~isin(keys, seen)
+        i = sort(i[new])
+        dots.append([(x[i], y[i])])
+        seen = concatenate((seen, keys[new]))
+    return dots
+
+
+#############################################################################
+# Rust auxiliary diagram: LHA on the prime vertical
+#
+# cos LHA = tan dec / tan lat, sin Hc = sin dec / sin lat, angles in
+# degrees, nan where the body does not cross the prime vertical
+
+def prime_vertical_lha(lat, dec):
+    cos_lha = tan(radians(dec)) / tan(radians(lat))
+    cos_lha = where(abs(cos_lha) > 1, nan, cos_lha)
+    return degrees(arccos(cos_lha))
+
+# altitude of the body when on the prime vertical
+def prime_vertical_altitude(lat, dec):
+    sin_hc = sin(radians(dec)) / sin(radians(lat))
+    sin_hc = where(abs(sin_hc) > 1, nan, sin_hc)
+    return degrees(arcsin(sin_hc))
+
+# radius of the gap left around (90,90) where the curves crowd together
+def rust_auxiliary_gap(d):
+    return where(mod(d,5) != 0, 10, where(mod(d,10) != 0, 3, 0))
+
+# d LHA / d lat along the curve of declination dec, both in degrees:
+# with c = tan dec / tan lat, d acos(c)/d lat = tan dec / (sin^2 lat sqrt(1-c^2))
+def prime_vertical_lha_slope(lat, dec):
+    c = tan(radians(dec)) / tan(radians(lat))
+    return tan(radians(dec)) / (sin(radians(lat))**2 * sqrt(1 - c**2))
+
+# the inverse, latitude on the prime vertical at a given LHA
+def prime_vertical_lat(lha, dec):
+    return degrees(arctan2(tan(radians(dec)), cos(radians(lha))))
+
+# the curves for declinations 0..89 with latitude as parameter,
+# sampled every lat_step degrees, or adaptively within tol degrees (see
+# sampling.py), and left out within rust_auxiliary_gap() of (90,90).
+#
+# LHA rises like the square root of the latitude from where the curve
+# starts at lat = d, so the adaptive curves use LHA as the parameter
+# instead, which is smooth all the way down to LHA = 0. Only d = 0,
+# the line LHA = 90, keeps latitude.
+#
+# Tiers: multiples of 10, of 5, odd and even declinations.
+def rust_auxiliary_spec(lat_step=.01, tol=None):
+    def gap(d, s, lat, lha):
+        return sqrt((lat-90.)**2 + (lha-90.)**2) < rust_auxiliary_gap(d)
+    def tier(d):
+        return select([mod(d,10) == 0, mod(d,5) == 0, mod(d,2) == 1],
+                      [0, 1, 2], 3)
+    spec = {'params': arange(90), 'mask': gap, 'tier': tier, 'tiers': 4}
+
+    if tol is None:
+        spec['samples'] = arange(0, 90+lat_step, lat_step)[1:-1]
+        spec['map'] = lambda d, lat: (lat, prime_vertical_lha(lat, d))
+    else:
+        def f(d, s):
+            lat = where(d == 0, s, prime_vertical_lat(s, d))
+            lha = where(d == 0, prime_vertical_lha(s, d), s)
+            return lat, lha
+        spec['map'] = f
+        spec['span'] = lambda d: (where(d == 0, lat_step, 0.),
+                                  where(d == 0, 90-lat_step, 90.))
+        spec['tol'] = tol
+        spec['min_step'] = lat_step
+    return spec
+
+# curve for declination d
+def rust_auxiliary_curve(d, lat_step=.01, tol=None):
+    return evaluate(rust_auxiliary_spec(lat_step, tol), [d])[0]
+
+# curves for declinations 0..89
+def rust_auxiliary_curves(lat_step=.01, tol=None):
+    return curves(rust_auxiliary_spec(lat_step, tol))[2]
+
+
+#############################################################################
+# Rust diagram: y = 90 cos d sin t
+
+# the curves start on a circle of radius r1 (multiples of 5) or r2
+# (the rest) about the origin, those on multiples of 10 at the origin
+def rust_curve_start(d, r1=10, r2=20):
+    c = sqrt(1+cos(radians(d))**2)
+    return where(mod(d,10) == 0, 0., where(mod(d,5) == 0, r1/c, r2/c))
+
+def rust_curve_point(t, d):
+    t = asarray(t, dtype=float)
+    return t, 90*cos(radians(d))*sin(radians(t))
+
+# dy/dt in plot units per degree
+def rust_curve_slope(t, d):
+    return 90*cos(radians(d))*cos(radians(t))*pi/180.
+
+# curves for declinations ds, n points each or adaptively within tol.
+# Tiers: multiples of 10, of 5 and the rest.
+def rust_spec(ds, n=120, tol=None):
+    spec = {'params': asarray(ds, dtype=float),
+            'map': lambda d, t: rust_curve_point(t, d),
+            'span': lambda d: (rust_curve_start(d), 90.),
+            'n': n,
+            'tier': step_tiers((10, 5)),
+            'tiers': 3}
+    if tol is not None:
+        spec['tol'] = tol
+        spec['n'] = 5
+    return spec
+
+# curve for declination d
+def rust_curve(d, n=120, tol=None):
+    return evaluate(rust_spec([d], n, tol), [d])[0]
@@ -0,0 +1,157 @@
+# Copyright 2014 Harri Ojanen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# inverse.py
+#
+# Inverse of the Brown-Nassau transformation, from a point (x',y') on
+# the rotor back to (d,t), all in radians as in geometry.brown_nassau().
+#
+# Undoing r' = asin r and then y = sin d, x = cos d cos t:
+#
+#   r = sin r',  (x,y) = (r/r') (x',y')
+#   d = asin y,  t = atan2(sqrt(1 - x^2 - y^2), x)
+#
+# where sqrt(1 - x^2 - y^2) = cos d sin t for t in [0,pi]. Points
+# outside the disk r' <= pi/2 give nan.
+#
+# inverse_brown_nassau() is exact. inverse_brown_nassau_fast() takes
+# sin r'/r' and cos r' = cos d sin t, both smooth in q = r'^2, by linear
+# interpolation from an n-entry table over [0,(pi/2)^2], built once per
+# n and small enough to stay in cache, and then
+#
+#   d = atan2(y, sqrt(x^2 + z^2)),  t = atan2(z, x),  z = cos r'
+#
+# which, unlike asin and sqrt(1 - x^2 - y^2), loses nothing next to the
+# pole and the rim. The points are taken 'chunk' at a time with in-place
+# ufuncs, so the temporaries stay in cache too. With n = 4097 that is
+# nearly twice as fast as the exact path and good to 1e-6 degrees, in t
+# to 1e-5 degrees up to d = 89; at the pole itself t is not defined.
+
+from numpy import *
+
+__all__ = ['inverse_brown_nassau', 'inverse_table',
+           'inverse_brown_nassau_fast']
+
+chunk_size = 2**13
+
+_tables = {}
+
+
+#############################################################################
+# exact
+
+def inverse_brown_nassau(xp, yp, flipped=False):
+    if flipped:
+        xp, yp = yp, xp
+    xp = asarray(xp, dtype=float)
+    yp = asarray(yp, dtype=float)
+
+    rp = hypot(xp, yp)
+    outside = rp > pi/2
+    # r/r' = sin(r')/r' -> 1 as r' -> 0
+    s = sinc(minimum(rp, pi/2)/pi)
+    x = s*xp
+    y = s*yp
+
+    d = arcsin(clip(y, -1, 1))
+    t = arctan2(sqrt(maximum(1 - x**2 - y**2, 0)), x)
+    return where(outside, nan, d), where(outside, nan, t)
+
+
+#############################################################################
+# table lookup
+
+# sin r'/r' and cos r' at n points q = r'^2 over [0,(pi/2)^2], each as
+# (values, slopes to the next), with an entry n of nan that the points
+# outside the disk are sent to
+def inverse_table(n=4097):
+    if n not in _tables:
+        rp = sqrt(linspace(0, (pi/2)**2, n))
+        table = []
+        for v in (sinc(rp/pi), cos(rp)):
+            table += [append(v, nan), append(diff(v), [0., nan])]
+        _tables[n] = table
+    return _tables[n]
+
+# (x',y') -> (d,t) for a chunk, q, u, z, i and m its temporaries
+def inverse_chunk(xp, yp, d, t, table, q, u, z, i, m):
+    s0, ds, c0, dc = table
+    n = len(s0) - 1
+
+    # table position and its fraction, the points outside (and nan) at
+    # entry n
+    multiply(xp, xp, out=q)
+    multiply(yp, yp, out=u)
+    q += u
+    less_equal(q, (pi/2)**2, out=m)
+    logical_not(m, out=m)
+    q *= (n-1)/(pi/2)**2
+    fmin(q, n-1, out=q)
+    copyto(i, q, casting='unsafe')
+    subtract(q, i, out=q)
+    add(i, m, out=i, casting='unsafe')
+
+    # z = cos r', and (x,y) = (sin r'/r') (x',y') into (t,d)
+    take(dc, i, out=z)
+    z *= q
+    z += take(c0, i, out=u)
+    take(ds, i, out=u)
+    u *= q
+    u += take(s0, i, out=q)
+    multiply(u, xp, out=t)
+    multiply(u, yp, out=d)
+
+    # cos d = sqrt(x^2 + z^2)
+    multiply(t, t, out=q)
+    multiply(z, z, out=u)
+    q += u
+    sqrt(q, out=q)
+    arctan2(d, q, out=d)
+    arctan2(z, t, out=t)
+
+# a contiguous input as a flat view, sliced without copying; others
+# (broadcast, strided) are copied a chunk at a time by .flat
+def flat_input(a):
+    if a.flags.c_contiguous:
+        return a.reshape(-1)
+    return a.flat
+
+# n entries in the table, the resolution
+def inverse_brown_nassau_fast(xp, yp, flipped=False, n=4097, chunk=None):
+    if flipped:
+        xp, yp = yp, xp
+    xp, yp = broadcast_arrays(asarray(xp, dtype=float),
+                              asarray(yp, dtype=float))
+    if n < 2:
+        raise ValueError('the table needs at least 2 entries')
+    if chunk is None:
+        chunk = chunk_size
+    table = inverse_table(n)
+
+    d = empty(xp.shape)
+    t = empty(xp.shape)
+    size = d.size
+    k = int(minimum(chunk, size))
+    q, u, z = empty(k), empty(k), empty(k)
+    i = empty(k, dtype=intp)
+    m = empty(k, dtype=bool)
+    fx, fy = flat_input(xp), flat_input(yp)
+    fd, ft = d.reshape(-1), t.reshape(-1)
+    for a in range(0, size, chunk):
+        b = int(minimum(a + chunk, size))
+        k = b - a
+        inverse_chunk(fx[a:b], fy[a:b], fd[a:b], ft[a:b], table,
+                      q[:k], u[:k], z[:k], i[:k], m[:k])
+    return d, t
@@ -0,0 +1,248 @@
+# Copyright 2014 Harri Ojanen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# layout.py
+#
+# Text extents measured once and a page extent found without drawing.
+#
+# The extent of a text, unrotated and relative to its anchor at the
+# left end of the baseline, depends only on the string and the font. It
+# is measured with matplotlib once per (string, font, size, line
+# spacing) and kept in memory and in text_extents.json in the cache
+# directory (see cache.py), so that later variants and runs do not
+# measure again.
+#
+# The extent of a text artist on the page follows from that by
+# rotating and aligning the box as matplotlib does (rotation_mode
+# 'default': the rotated box is aligned, 'anchor': the box is aligned
+# and then rotated about the anchor), plus the pad of its bbox patch.
+# page_bbox() is the union of the axes, their visible spines with the
+# tick marks, tick labels and axis labels, and all texts on them, in
+# inches, which export.py then uses instead of a tight-bbox draw.
+# Only Axis._autolabelpos is read outside the public matplotlib API; a
+# matplotlib without it falls back to that draw.
+
+import json
+import os
+import tempfile
+
+from numpy import abs, cos, radians, sin
+
+from .cache import cache_dir
+
+_extents = None
+_dirty = False
+
+
+#############################################################################
+# measured extents
+
+def extents_path():
+    return os.path.join(cache_dir(), 'text_extents.json')
+
+def load_extents():
+    global _extents
+    if _extents is None:
+        try:
+            with open(extents_path()) as f:
+                _extents = json.load(f)
+        except (IOError, OSError, ValueError):
+            _extents = {}
+    return _extents
+
+# write new measurements, called when the page extents are known
+def save_extents():
+    global _dirty
+    if not _dirty:
+        return
+    dire = cache_dir()
+    try:
+        if not os.path.isdir(dire):
+            os.makedirs(dire)
+        fd, tmp = tempfile.mkstemp(dir=dire, prefix='.tmp-')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(_extents, f)
+        os.replace(tmp, extents_path())
+    except (IOError, OSError):
+        return
+    _dirty = False
+
+# dpi a Text artist is drawn at, 72 for one not on a figure yet
+def text_dpi(text):
+    return text.figure.dpi if text.figure is not None else 72.
+
+def font_key(text):
+    import matplotlib
+    fp = text.get_fontproperties()
+    return json.dumps([matplotlib.__version__, text_dpi(text), text.get_text(),
+                       fp.get_family(), fp.get_style(), fp.get_weight(),
+                       fp.get_size_in_points(), text.get_linespacing()])
+
+# unrotated extent (x0, y0, x1, y1) in points of the text of a Text
+# artist, relative to the left end of its (first) baseline, as hinted at
+# the dpi of its figure
+def text_extent(text):
+    global _dirty
+    extents = load_extents()
+    key = font_key(text)
+    if key not in extents:
+        extents[key] = measure(text)
+        _dirty = True
+    return extents[key]
+
+def measure(text):
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.text import Text
+    dpi = text_dpi(text)
+    fig = Figure(dpi=dpi)
+    renderer = FigureCanvasAgg(fig).get_renderer()
+    t = Text(0, 0, text.get_text(), fontproperties=text.get_fontproperties(),
+             linespacing=text.get_linespacing(),
+             horizontalalignment='left', verticalalignment='baseline')
+    t.set_figure(fig)
+    return [e*72./dpi for e in t.get_window_extent(renderer).extents]
+
+
+#############################################################################
+# extents on the page
+
+# offsets of the left and bottom of a w x h box from its anchor, as
+# matplotlib aligns a Text whose extent reaches y0 below and y1 above the
+# baseline; in 'anchor' rotation mode the box is the unrotated one
+def aligned(w, h, y0, y1, ha, va, anchor=False):
+    left = {'left': 0, 'center': -w/2, 'right': -w}[ha]
+    if va == 'baseline':
+        bottom = y1 - h if anchor else y0
+    elif va == 'center_baseline':
+        bottom = y1/2 - h
+    else:
+        bottom = {'bottom': 0, 'center': -h/2, 'top': -h}[va]
+    return left, bottom
+
+# display extent (x0, y0, x1, y1) of a Text artist, without drawing
+def text_bbox(text):
+    from matplotlib.transforms import Bbox
+    x0, y0, x1, y1 = text_extent(text)
+    w = x1 - x0
+    h = y1 - y0
+    a = radians(text.get_rotation())
+    ha = text.get_horizontalalignment()
+    va = text.get_verticalalignment()
+    if text.get_rotation_mode() == 'anchor':
+        l, b = aligned(w, h, y0, y1, ha, va, True)
+        xs = [u*cos(a) - v*sin(a) for u in (l, l + w) for v in (b, b + h)]
+        ys = [u*sin(a) + v*cos(a) for u in (l, l + w) for v in (b, b + h)]
+        left, bottom = min(xs), min(ys)
+        W, H = max(xs) - left, max(ys) - bottom
+    else:
+        W = abs(w*cos(a)) + abs(h*sin(a))
+        H = abs(w*sin(a)) + abs(h*cos(a))
+        left, bottom = aligned(W, H, y0, y1, ha, va)
+
+    pad = 0
+    patch = text.get_bbox_patch()
+    if patch is not None:
+        pad = (patch.get_boxstyle().pad*text.get_fontsize() +
+               patch.get_linewidth()/2)
+
+    k = text.figure.dpi/72.
+    X, Y = text.get_transform().transform(text.get_unitless_position())
+    return Bbox.from_extents(X + (left - pad)*k, Y + (bottom - pad)*k,
+                             X + (left + W + pad)*k, Y + (bottom + H + pad)*k)
+
+# the ticks of an axis that draw() shows, those within its view
+# interval, with their labels formatted
+def drawn_ticks(axis):
+    axis.get_majorticklabels()
+    axis.get_minorticklabels()
+    trans = axis.get_transform()
+    lo, hi = sorted(trans.transform(axis.get_view_interval()))
+    tol = (hi - lo)*1e-10
+    ticks = (axis.get_major_ticks(len(axis.get_majorticklocs())) +
+             axis.get_minor_ticks(len(axis.get_minorticklocs())))
+    return [t for t in ticks
+            if lo - tol <= trans.transform(t.get_loc()) <= hi + tol]
+
+# display extents of the tick labels of an axis, as draw() shows them,
+# and of its label, placed beyond them and the spine by labelpad as
+# matplotlib places it when drawing
+def axis_bboxes(axis):
+    from matplotlib.transforms import Bbox
+    if not axis.get_visible():
+        return []
+    ticks = drawn_ticks(axis)
+    boxes = [[text_bbox(t) for t in labels
+              if t.get_visible() and t.get_text()]
+             for labels in ([tick.label1 for tick in ticks],
+                            [tick.label2 for tick in ticks])]
+
+    label = axis.label
+    if label.get_visible() and label.get_text():
+        if axis._autolabelpos:
+            side = axis.label_position
+            spine = axis.axes.spines.get(side, axis.axes)
+            outer = side in ('bottom', 'left')
+            b = Bbox.union(boxes[0 if outer else 1] +
+                           [spine.get_window_extent()])
+            pad = axis.labelpad*axis.figure.dpi/72.
+            x, y = label.get_position()
+            if side == 'bottom':
+                label.set_position((x, b.y0 - pad))
+            elif side == 'top':
+                label.set_position((x, b.y1 + pad))
+            elif side == 'left':
+                label.set_position((b.x0 - pad, y))
+            else:
+                label.set_position((b.x1 + pad, y))
+        boxes[0].append(text_bbox(label))
+    return boxes[0] + boxes[1]
+
+# display extents of the visible spines, tick labels and axis labels
+# and all visible texts on the axes
+def axes_bboxes(ax):
+    boxes = []
+    if ax.axison:
+        boxes += [s.get_window_extent() for s in ax.spines.values()
+                  if s.get_visible()]
+        boxes += axis_bboxes(ax.xaxis) + axis_bboxes(ax.yaxis)
+    boxes += [text_bbox(t) for t in ax.texts
+              if t.get_visible() and t.get_text()]
+    return boxes
+
+# union of the axes of fig, grown by 'margins' (left, bottom, right,
+# top) in points, and of what is drawn on them, in inches. A matplotlib
+# without the few private attributes read above (Axis._autolabelpos)
+# gets a tight-bbox draw instead.
+def page_bbox(fig, margins=(0, 0, 0, 0)):
+    from matplotlib.transforms import Bbox
+    boxes = []
+    k = fig.dpi/72.
+    for ax in fig.axes:
+        ax.apply_aspect()
+        b = ax.bbox
+        boxes.append(Bbox.from_extents(b.x0 - margins[0]*k,
+                                       b.y0 - margins[1]*k,
+                                       b.x1 + margins[2]*k,
+                                       b.y1 + margins[3]*k))
+    try:
+        for ax in fig.axes:
+            boxes += axes_bboxes(ax)
+    except AttributeError:
+        from .export import tight_bbox
+        boxes.append(tight_bbox(fig, refresh=True).transformed(
+            fig.dpi_scale_trans))
+    save_extents()
+    return Bbox.union(boxes).transformed(fig.dpi_scale_trans.inverted())
@@ -0,0 +1,190 @@
+# Copyright 2014 Harri Ojanen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# nomogram.py
+#
+# Curve families of nomograms from declarative specs.
+#
+# A family is a dict
+#
+#   'params'   the parameter k of each curve, e.g. the declinations
+#   'map'      f(k, s) -> (x, y) in plot units, s the parameter along
+#              the curves
+#   'samples'  values of s common to all curves, or
+#   'span'     f(k) -> (s0, s1), the interval of s of each curve, with
+#   'n'        points evenly over it, or with
+#   'tol'      adaptive sampling within tol plot units starting from 'n'
+#              points (17 by default), down to 'min_step' (see
+#              sampling.py)
+#   'keep'     f(k, s) -> true for the samples each curve keeps, e.g.
+#              to shorten it or to sample it more sparsely; optional
+#   'mask'     f(k, s, x, y) -> true where the curve is left out, the
+#              masked points breaking it (gaps); optional
+#   'tier'     f(k) -> style tier of each curve, optional, see
+#              step_tiers()
+#   'tiers'    the number of tiers, 1 by default
+#   'labels'   {'params': ks, 'place': f(ks) -> (x, y, angles),
+#               'format': '%d'}, see labels.py; optional
+#
+# The functions take and return numpy arrays and broadcast: the curves
+# are evaluated with k as a column and s as a row (or a 2-D array of
+# the spans), so that a whole family, or a chunk of its curves, is one
+# call of each function. Adaptive sampling makes one call per level of
+# refinement for the whole family. Points where map() is undefined are
+# nan, and the warnings of computing them are silenced.
+#
+# A new nomogram is a spec and a style for each tier:
+#
+#   spec = {'params': arange(0, 90, 5), 'map': lambda k, s: (s, k*sin(s)),
+#           'samples': linspace(0, 3, 100), 'tier': step_tiers(10),
+#           'tiers': 2}
+#   render.draw_chunks(ax, iter_tiers(spec, 64), styles)
+
+from numpy import *
+
+from .sampling import adaptive_family
+
+__all__ = ['step_tiers', 'tier_count', 'evaluate', 'iter_curves', 'curves',
+           'group', 'iter_tiers', 'tiers', 'labels']
+
+
+#############################################################################
+# tiering rules
+
+# tier of each k: the first of the intervals 'steps' (coarsest first)
+# that k is a multiple of, and len(steps) for the rest
+def step_tiers(steps, tol=1e-9):
+    steps = list(atleast_1d(steps))
+    def tier(k):
+        k = asarray(k, dtype=float)
+        t = full(shape(k), len(steps))
+        for s in reversed(range(len(steps))):
+            q = k/steps[s]
+            t = where(abs(q - round(q)) < tol, s, t)
+        return t
+    return tier
+
+def tier_count(spec):
+    return spec.get('tiers', 1)
+
+def curve_tiers(spec, k):
+    if 'tier' not in spec:
+        return zeros(len(k), dtype=int)
+    return broadcast_to(spec['tier'](k), shape(k)).astype(int)
+
+
+#############################################################################
+# evaluation
+
+def apply_mask(spec, k, s, x, y):
+    if 'mask' not in spec:
+        return x, y
+    m = spec['mask'](k, s, x, y)
+    return where(m, nan, x), where(m, nan, y)
+
+# curves of the parameters k as a list of (x,y)
+def evaluate(spec, k):
+    k = asarray(k)
+    if len(k) == 0:
+        return []
+    with errstate(divide='ignore', invalid='ignore'):
+        if 'tol' in spec:
+            return evaluate_adaptive(spec, k)
+
+        K = k[:,newaxis]
+        if 'samples' in spec:
+            S = asarray(spec['samples'])[newaxis,:]
+        else:
+            s0, s1 = spec['span'](k)
+            S = linspace(broadcast_to(s0, shape(k)),
+                         broadcast_to(s1, shape(k)), spec['n'], axis=-1)
+        x, y = spec['map'](K, S)
+        x, y = apply_mask(spec, K, S, x, y)
+        x, y = broadcast_arrays(x, y)
+        if 'keep' not in spec:
+            return [(x[j], y[j]) for j in range(len(k))]
+
+        keep = broadcast_to(spec['keep'](K, S), x.shape)
+    out = []
+    for j in range(len(k)):
+        i = flatnonzero(keep[j])
+        if len(i) and i[-1] - i[0] + 1 == len(i):
+            out.append((x[j,i[0]:i[-1]+1], y[j,i[0]:i[-1]+1]))
+        else:
+            out.append((x[j,i], y[j,i]))
+    return out
+
+def evaluate_adaptive(spec, k):
+    def f(s, kk):
+        x, y = spec['map'](kk, s)
+        return apply_mask(spec, kk, s, x, y)
+    s0, s1 = spec['span'](k)
+    return adaptive_family(f, k, s0, s1, spec['tol'], spec.get('n', 17),
+                           spec.get('min_step'))
+
+
+#############################################################################
+# families
+
+# (k, tiers, curves) of chunks of at most 'chunk' curves, all at once
+# with chunk=None
+def iter_curves(spec, chunk=None):
+    params = asarray(spec['params'])
+    if chunk is None or 'tol' in spec:
+        chunk = len(params) or 1
+    for i in range(0, len(params), chunk):
+        k = params[i:i+chunk]
+        yield k, curve_tiers(spec, k), evaluate(spec, k)
+
+# all curves as (k, tiers, curves)
+def curves(spec):
+    ks = []
+    ts = []
+    cs = []
+    for (k, t, c) in iter_curves(spec):
+        ks.append(k)
+        ts.append(t)
+        cs += c
+    if not ks:
+        return asarray(spec['params']), zeros(0, dtype=int), []
+    return concatenate(ks), concatenate(ts), cs
+
+# curves grouped by tier, in parameter order
+def group(curves, tier, n_tiers):
+    family = [[] for s in range(n_tiers)]
+    for (c, s) in zip(curves, tier):
+        family[s].append(c)
+    return family
+
+# the family grouped by tier a chunk at a time, as render.draw_chunks()
+# takes them
+def iter_tiers(spec, chunk=None):
+    for (k, t, c) in iter_curves(spec, chunk):
+        yield group(c, t, tier_count(spec))
+
+# the whole family grouped by tier, tiers[s] a list of (x,y)
+def tiers(spec):
+    k, t, c = curves(spec)
+    return group(c, t, tier_count(spec))
+
+# (x, y, angles, texts) of the labels, or None
+def labels(spec):
+    lab = spec.get('labels')
+    if lab is None:
+        return None
+    ks = lab['params']
+    x, y, angles = lab['place'](ks)
+    fmt = lab.get('format', '%d')
+    return x, y, angles, [fmt % k for k in ks]
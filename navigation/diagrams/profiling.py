@@ -0,0 +1,207 @@
+# Copyright 2014 Harri Ojanen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# profiling.py
+#
+# Opt-in timing of the stages of create().
+#
+# The diagrams wrap each stage of drawing in stage() and each diagram
+# in diagram(); both do nothing until profiling is started, with
+# start() or by setting $NAVIGATION_PROFILE to the output file (which
+# also covers the worker processes of batch.py). Then every diagram
+# appends one JSON record, a line of the output file:
+#
+#   {"diagram": name, "pid": ..., "wall": s, "cpu": s, "peak_rss": bytes,
+#    "stages": [{"stage": name, "wall": s, "cpu": s, "blocks": n,
+#                "peak_rss": bytes, "artists": n, "vertices": n}, ...]}
+#
+# where blocks is the change in the number of allocated Python memory
+# blocks and artists and vertices are the numbers added by the stage.
+#
+# mode 'tracemalloc' ($NAVIGATION_PROFILE_MODE) adds to each stage the
+# bytes allocated and the peak of allocations, and to the record the
+# top allocation sites of the diagram. mode 'cprofile' writes the
+# cProfile statistics of each diagram next to the output file as
+# <output>.<diagram>.<pid>.prof and names that file in the record.
+
+import contextlib
+import json
+import os
+import resource
+import sys
+import time
+
+MODES = (None, 'tracemalloc', 'cprofile')
+
+# output file and mode when profiling, see start()
+output = os.environ.get('NAVIGATION_PROFILE') or None
+mode = os.environ.get('NAVIGATION_PROFILE_MODE') or None
+
+# number of allocation sites recorded in mode 'tracemalloc'
+top_sites = 10
+
+_record = None
+
+
+#############################################################################
+# switching on and off
+
+def start(path, profile_mode=None):
+    global output, mode
+    if profile_mode not in MODES:
+        raise ValueError('unknown profiling mode %r, expected one of %s'
+                         % (profile_mode, ', '.join(map(str, MODES))))
+    output = path
+    mode = profile_mode
+
+def stop():
+    global output, mode
+    output = None
+    mode = None
+
+def active():
+    return output is not None
+
+
+#############################################################################
+# counts
+
+def artist_count(fig):
+    from .vector import Page
+    if isinstance(fig, Page):
+        return len(fig.items)
+    return sum([len(ax.get_children()) for ax in fig.axes])
+
+def vertex_count(fig):
+    from .vector import Page
+    if isinstance(fig, Page):
+        n = 0
+        for item in fig.items:
+            if item[0] == 'lines':
+                n += sum([len(xy) for xy in item[1]])
+            elif item[0] == 'dots':
+                n += len(item[1])
+        return n
+
+    from matplotlib.collections import Collection, PathCollection
+    from matplotlib.lines import Line2D
+    n = 0
+    for ax in fig.axes:
+        for a in ax.get_children():
+            if isinstance(a, Line2D):
+                n += len(a.get_xydata())
+            elif isinstance(a, PathCollection):
+                n += len(a.get_offsets())
+            elif isinstance(a, Collection):
+                n += sum([len(p.vertices) for p in a.get_paths()])
+    return n
+
+def peak_rss():
+    k = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss*k
+
+
+#############################################################################
+# records
+
+# one diagram, nested calls are part of the outermost one
+@contextlib.contextmanager
+def diagram(name):
+    global _record
+    if not active() or _record is not None:
+        yield
+        return
+
+    import tracemalloc
+    record = {'diagram': name, 'pid': os.getpid(), 'stages': []}
+    profiler = None
+    if mode == 'tracemalloc':
+        tracemalloc.start()
+    elif mode == 'cprofile':
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    _record = record
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    try:
+        yield
+    finally:
+        record['wall'] = time.perf_counter() - wall
+        record['cpu'] = time.process_time() - cpu
+        record['peak_rss'] = peak_rss()
+        _record = None
+
+        if mode == 'tracemalloc':
+            stats = tracemalloc.take_snapshot().statistics('lineno')
+            record['allocations'] = [
+                {'site': str(s.traceback), 'bytes': s.size, 'count': s.count}
+                for s in stats[:top_sites]]
+            tracemalloc.stop()
+        elif profiler is not None:
+            profiler.disable()
+            path = '%s.%s.%d.prof' % (output, name.strip('_'), os.getpid())
+            profiler.dump_stats(path)
+            record['profile'] = path
+        write(record)
+
+# one stage of the current diagram, counting what it adds to fig
+@contextlib.contextmanager
+def stage(name, fig=None):
+    if _record is None:
+        yield
+        return
+
+    import tracemalloc
+    tracing = tracemalloc.is_tracing()
+    entry = {'stage': name}
+    if fig is not None:
+        artists = artist_count(fig)
+        vertices = vertex_count(fig)
+    if tracing:
+        tracemalloc.reset_peak()
+        traced = tracemalloc.get_traced_memory()[0]
+    blocks = sys.getallocatedblocks()
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    try:
+        yield
+    finally:
+        entry['wall'] = time.perf_counter() - wall
+        entry['cpu'] = time.process_time() - cpu
+        entry['blocks'] = sys.getallocatedblocks() - blocks
+        entry['peak_rss'] = peak_rss()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            entry['alloc_bytes'] = current - traced
+            entry['alloc_peak'] = peak - traced
+        if fig is not None:
+            entry['artists'] = artist_count(fig) - artists
+            entry['vertices'] = vertex_count(fig) - vertices
+        _record['stages'].append(entry)
+
+def write(record):
+    line = json.dumps(record) + '\n'
+    if output == '-':
+        sys.stdout.write(line)
+        return
+    # a single append per record, so that worker processes can share the
+    # file
+    fd = os.open(output, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line.encode('utf-8'))
+    finally:
+        os.close(fd)
@@ -0,0 +1,240 @@
+# Copyright 2014 Harri Ojanen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# render.py
+#
+# Drawing helpers shared by the diagrams.
+#
+# matplotlib is imported here only inside the functions, and figures
+# are created directly on an Agg canvas, so no pyplot state or
+# interactive backend is involved.
+#
+# With the 'native' backend the figure and the axes are one
+# vector.Page, and the helpers below pass the geometry on to it.
+#
+# The files saved and the vertex counts of the simplified curves are
+# info messages of the logger 'log', shown by the scripts through
+# log_to_stdout().
+
+import logging
+import sys
+
+from numpy import *
+
+from .vector import Page
+
+BACKENDS = ('matplotlib', 'native')
+
+log = logging.getLogger(__name__)
+
+def log_to_stdout():
+    logging.basicConfig(level=logging.INFO, format='%(message)s',
+                        stream=sys.stdout)
+
+
+#############################################################################
+# figure
+
+def new_figure(figsize=None):
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+# figure and axes to draw a diagram on
+def new_axes(backend='matplotlib'):
+    if backend == 'native':
+        page = Page()
+        return page, page
+    elif backend == 'matplotlib':
+        fig = new_figure()
+        return fig, fig.add_subplot(111)
+    raise ValueError('unknown backend %r, expected one of %s'
+                     % (backend, ', '.join(BACKENDS)))
+
+# equal aspect, fixed extent and no visible axes or spines
+def format_axes(ax, extent):
+    if isinstance(ax, Page):
+        ax.axis(extent)
+        return
+
+    ax.set_aspect(1.)
+
+    ax.axis(extent)
+
+    ax.xaxis.set_visible(False)
+    ax.yaxis.set_visible(False)
+
+    for side in ['top','bottom','right','left']:
+        ax.spines[side].set_visible(False)
+
+# data units per point in x and y, once the limits of ax are set
+def point_scale(ax):
+    if isinstance(ax, Page):
+        return 1./ax.scale, 1./ax.scale
+    ax.apply_aspect()
+    x0, x1 = ax.get_xlim()
+    y0, y1 = ax.get_ylim()
+    bbox = ax.get_window_extent()
+    k = 72./ax.figure.dpi
+    return (x1-x0)/(bbox.width*k), (y1-y0)/(bbox.height*k)
+
+
+#############################################################################
+# simplification
+
+# tiers simplified with the parameters in 'simplification', a dict
+# with 'tol' and 'grid' in points (see simplify.py) or None to keep
+# them as they are, and the vertex counts before and after reported
+# under 'name' if given
+def simplify(ax, tiers, simplification, name=None):
+    from .simplify import simplify_tiers, vertex_count
+    if simplification is None:
+        return tiers
+    before = vertex_count(tiers)
+    tiers = simplify_tiers(tiers, simplification.get('tol'),
+                           simplification.get('grid'), point_scale(ax))
+    if name is not None:
+        report_vertices(name, before, vertex_count(tiers))
+    return tiers
+
+def report_vertices(name, before, after):
+    log.info('%s: %d -> %d vertices', name, before, after)
+
+
+#############################################################################
+# lines and curves
+
+# segments as an (N,2,2) array, see scales.py
+def draw_segments(ax, segs, clr, w=.1):
+    if isinstance(ax, Page):
+        return ax.lines(segs, clr, w)
+    from matplotlib.collections import LineCollection
+    lc = LineCollection(segs, colors=[clr], linewidths=w)
+    ax.add_collection(lc)
+    return lc
+
+# one artist per style tier, tiers[s] is a list of (x,y) arrays
+def draw_tiers(ax, tiers, styles):
+    dots = []
+    for s in range(len(tiers)):
+        if len(tiers[s]) == 0:
+            continue
+        if styles[s]['marker'] == '-':
+            segs = [column_stack((x,y)) for (x,y) in tiers[s]]
+            draw_segments(ax, segs, styles[s]['color'], styles[s]['width'])
+        else:
+            dots.append(s)
+    draw_dots(ax, [tiers[s] for s in dots], [styles[s] for s in dots])
+
+# dots of each tier as one collection, the marker path defined once.
+# The sizes are those of plot() markers: markersize sz is scatter size
+# sz**2 with a 1 point edge.
+def draw_dots(ax, tiers, styles):
+    for s in range(len(tiers)):
+        x = concatenate([x for (x,y) in tiers[s]])
+        y = concatenate([y for (x,y) in tiers[s]])
+        clr = styles[s]['color']
+        sz = styles[s]['size']
+        if isinstance(ax, Page):
+            ax.dots(x, y, clr, sz)
+        else:
+            ax.scatter(x, y, s=sz**2, color=[clr], marker=styles[s]['marker'],
+                       linewidths=1.)
+
+# one artist per curve, the reference for draw_tiers()
+def draw_curves(ax, tiers, styles):
+    if isinstance(ax, Page):
+        return draw_tiers(ax, tiers, styles)
+    for s in range(len(tiers)):
+        marker = styles[s]['marker']
+        clr = styles[s]['color']
+        w = styles[s]['width']
+        sz = styles[s]['size']
+        for (x,y) in tiers[s]:
+            ax.plot(x,y,marker,color=clr,linewidth=w,markersize=sz)
+
+
+# tiers arriving in chunks (see geometry.iter_grid_curves()), each
+# simplified and drawn before the next one is computed, with the vertex
+# counts of all of them reported once
+def draw_chunks(ax, chunks, styles, batched=True, simplification=None,
+                name='grid'):
+    from .simplify import vertex_count
+    before = 0
+    after = 0
+    for tiers in chunks:
+        if simplification is not None:
+            before += vertex_count(tiers)
+            tiers = simplify(ax, tiers, simplification)
+            after += vertex_count(tiers)
+        if batched:
+            draw_tiers(ax, tiers, styles)
+        else:
+            draw_curves(ax, tiers, styles)
+    if simplification is not None:
+        report_vertices(name, before, after)
+
+
+#############################################################################
+# scale distortion of the Brown-Nassau grid (see geometry.grid_scales())
+
+# min_gap and, with density='auto', max_segment given in points, as
+# plot units of ax for geometry.grid_curves()
+def grid_units(ax, layout, density, min_gap, max_segment=1.):
+    from .geometry import auto_density
+    if min_gap is None and density != 'auto':
+        return density, min_gap
+    scale = point_scale(ax)[0]
+    if min_gap is not None:
+        min_gap = float(around(min_gap*scale, 9))
+    if density == 'auto':
+        density = auto_density(max_segment*scale, layout)
+    return density, min_gap
+
+# the scale 'name' as a heat map under everything else, matplotlib only
+def draw_heatmap(ax, name, layout, flipped=False, cmap='viridis', alpha=.35,
+                 n=256):
+    from .geometry import scale_field
+    if isinstance(ax, Page):
+        raise ValueError("the heat map needs backend='matplotlib'")
+    x, y, v = scale_field(name, layout, flipped, n)
+    return ax.pcolormesh(x, y, ma.masked_invalid(v), shading='gouraud',
+                         cmap=cmap, alpha=alpha, zorder=0, rasterized=True)
+
+
+#############################################################################
+# page
+
+# page of a drawn figure: its axes grown by 'margins' (left, bottom,
+# right, top) in points, with their spines, tick and axis labels and all
+# their texts, found without drawing (see layout.py) and used by save()
+def fix_page(fig, margins=(0,0,0,0)):
+    if isinstance(fig, Page):
+        return
+    from .layout import page_bbox
+    from .export import set_bbox
+    set_bbox(fig, page_bbox(fig, margins))
+
+
+#############################################################################
+# save
+
+# formats as in export.py, each written from a single draw
+def save(fig, dire, file_name, formats=('svg','pdf'), workers=None):
+    from .export import export
+    log.info('%s', file_name)
+    return export(fig, dire, file_name, formats, workers=workers)
@@ -0,0 +1,133 @@
+# Copyright 2014 Harri Ojanen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Rust auxiliary diagram
+#
+# Run as
+#   python -m navigation.diagrams.rust_auxiliary
+# or call create().
+
+from numpy import *
+
+from .cache import rust_auxiliary_curves
+from .geometry import rust_auxiliary_spec
+from .labels import rust_auxiliary_labels, draw_labels
+from . import nomogram, profiling, render
+
+# default output directory and file name
+dire = '/home/harri/mac/'
+file_name = '_rust_auxiliary'
+
+# sampling: every lat_step degrees of latitude, or adaptively within
+# tol degrees when tol is not None (see sampling.py)
+lat_step = .01
+tol = .05
+
+# polyline simplification in points, None to draw every computed
+# vertex (see simplify.py)
+simplification = {'tol': .05, 'grid': .01}
+
+# axis limits
+extent = (-4.5,94.5,-4.5,94.5)
+
+
+#############################################################################
+# color and width of the curves of each tier of the spec: declinations
+# on multiples of 10, of 5, odd and even ones
+
+styles = [{'marker': '-', 'color': (1,0,0), 'width': 1.25},
+          {'marker': '-', 'color': (0,0,0), 'width': 1.25},
+          {'marker': '-', 'color': (0,0,0), 'width': .5},
+          {'marker': '-', 'color': (.5,.5,.5), 'width': .5}]
+
+
+#############################################################################
+# curves for declinations 0..89 with latitude as parameter
+
+# the nomogram spec of the diagram, see nomogram.py
+def spec(lat_step=lat_step, tol=tol):
+    s = rust_auxiliary_spec(lat_step, tol)
+    s['labels'] = {'params': [1] + list(range(5,90,5)),
+                   'place': rust_auxiliary_labels}
+    return s
+
+# the tiers drawn from the least emphasized up
+def draw_curves(ax, lat_step=lat_step, tol=tol, simplification=None):
+    s = spec(lat_step, tol)
+    curves = rust_auxiliary_curves(lat_step, tol)
+    tiers = nomogram.group(curves, s['tier'](s['params']), s['tiers'])
+    tiers = render.simplify(ax, tiers, simplification, file_name)
+    render.draw_tiers(ax, tiers[::-1], styles[::-1])
+
+    lat, lha, angles, texts = nomogram.labels(s)
+    draw_labels(ax, lat, lha, angles, texts,
+                horizontalalignment='center',
+                verticalalignment='center',
+                fontsize=7,
+                color='k',
+                bbox=dict(facecolor='white',edgecolor='white',pad=0))
+
+
+#############################################################################
+# axes
+
+def format_axes(ax):
+    from matplotlib.ticker import MultipleLocator
+
+    ax.grid()
+
+    ax.set_xlabel('latitude on x-axis, declination is curve parameter',
+                  fontsize=9)
+    ax.set_ylabel('LHA on prime vertical',fontsize=9)
+
+    ax.xaxis.set_major_locator(MultipleLocator(5))
+    ax.xaxis.set_minor_locator(MultipleLocator(1))
+
+    ax.yaxis.set_major_locator(MultipleLocator(5))
+    ax.yaxis.set_minor_locator(MultipleLocator(1))
+
+    ax.xaxis.set_tick_params(which='both',direction='out',labelsize=7,
+                             labeltop=True)
+    ax.yaxis.set_tick_params(which='both',direction='out',labelsize=7,
+                             labelright=True)
+
+
+#############################################################################
+# draw whole diagram, returns the figure
+
+def draw(lat_step=lat_step, tol=tol, simplification=simplification):
+    fig = render.new_figure()
+    ax = fig.add_subplot(111)
+    ax.set_aspect(0.7)
+    ax.axis(extent)
+    with profiling.stage('draw_curves', fig):
+        draw_curves(ax, lat_step, tol, simplification)
+    with profiling.stage('format_axes', fig):
+        format_axes(ax)
+    with profiling.stage('fix_page', fig):
+        render.fix_page(fig)
+    return fig
+
+# create and save whole diagram
+def create(dire=dire, formats=('svg','pdf'), lat_step=lat_step, tol=tol,
+           workers=None, simplification=simplification):
+    with profiling.diagram(file_name):
+        fig = draw(lat_step, tol, simplification)
+        render.save(fig, dire, file_name, formats, workers)
+    return fig
+
+if __name__ == '__main__':
+    render.log_to_stdout()
+    create()
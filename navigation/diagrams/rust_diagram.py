@@ -0,0 +1,230 @@
+# Copyright 2014 Harri Ojanen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Rust diagram
+#
+# Run as
+#   python -m navigation.diagrams.rust_diagram
+# or call create().
+
+from numpy import *
+
+from .geometry import rust_spec
+from .labels import (cut_gaps, draw_labels, footprints, rust_labels,
+                     screen_angles)
+from .scales import axis_ticks, tick_lengths
+from . import nomogram, profiling, render
+
+font_size = 5
+
+# curves sampled adaptively within tol, or at 120 points if None
+tol = .05
+
+# polyline simplification in points, None to draw every computed
+# vertex (see simplify.py)
+simplification = {'tol': .05, 'grid': .01}
+
+# axis limits
+extent = (-4.5,94.5,-4.5,94.5)
+
+# space left between a label and the lines cut around it, in points
+label_pad = 1.5
+
+# default output directory and file name
+dire = '/home/harri/mac/'
+file_name = '_rust_diagram'
+
+
+#############################################################################
+# tick label formatters
+
+def format_rev(x, pos=None):
+    if x % 10 == 0:
+        return '%d' % (90-x)
+    else:
+        return ''
+
+def format_none(x, pos=None):
+    return ''
+
+def format_tens(x, pos=None):
+    if x % 10 == 0:
+        return '%d' % x
+    else:
+        return ''
+
+
+#############################################################################
+# curves, tiers of the spec: declinations on multiples of 10, of 5 and
+# the rest
+
+styles = [{'marker': '-', 'color': 'r', 'width': 1.5},
+          {'marker': '-', 'color': '0.3', 'width': 1.5},
+          {'marker': '-', 'color': '0.7', 'width': 1.5}]
+
+# the nomogram spec of the diagram, see nomogram.py
+def spec(ds, tol=tol, labeled=()):
+    s = rust_spec(ds, tol=tol)
+    s['labels'] = {'params': list(labeled), 'place': rust_labels}
+    return s
+
+# the curves grouped by tier, with the footprints of the labels (see
+# labels.py) cut out of them, gaps[i] those of curve i
+def curve_tiers(ax,s,simplification=None,gaps=None,name=None):
+    k, tier, cs = nomogram.curves(s)
+    cs = render.simplify(ax, [cs], simplification, name)[0]
+    if gaps is not None:
+        scale = render.point_scale(ax)
+        cs = [cut_gaps(t, y, g, scale) for ((t, y), g) in zip(cs, gaps)]
+    return nomogram.group(cs, tier, nomogram.tier_count(s))
+
+# labels of the spec, and the footprint of each as a list of gaps to
+# cut from its curve
+def curve_label_layout(ax,s):
+    t, y, angles, texts = nomogram.labels(s)
+    rotations = screen_angles(ax, angles, t, y)
+    gaps = footprints(t, y, rotations, texts, font_size, label_pad)
+    return (t, y, angles, texts), [[g] for g in gaps]
+
+# labels of the curves, all in one pass
+def curve_labels(ax,layout,colors):
+    t, y, angles, texts = layout
+    draw_labels(ax, t, y, angles, texts, colors=colors,
+                horizontalalignment='center',
+                verticalalignment='center',
+                fontsize=font_size)
+
+
+#############################################################################
+# axes with ticks on all four sides
+
+def format_axes(ax):
+    from matplotlib.ticker import FuncFormatter, MultipleLocator
+
+    ax.set_aspect(0.7)
+
+    ax.xaxis.set_major_locator(MultipleLocator(5))
+    ax.xaxis.set_minor_locator(MultipleLocator(1))
+    ax.xaxis.set_major_formatter(FuncFormatter(format_tens))
+
+    ax.yaxis.set_major_locator(MultipleLocator(10))
+    ax.yaxis.set_minor_locator(MultipleLocator(1))
+    ax.yaxis.set_major_formatter(FuncFormatter(format_none))
+
+    ax.xaxis.set_tick_params(which='both',direction='out',labelsize=7)
+    ax.yaxis.set_tick_params(which='both',direction='out',labelsize=7)
+
+# tick labels on the curve d = 0 with their footprints
+def frame_label_layout():
+    X = arange(5,95,5)
+    Y = 3+90*sin(radians(X))
+    texts = ['%d'%x for x in X]
+    return (X, Y, texts), footprints(X, Y, zeros(len(X)), texts, font_size,
+                                     label_pad)
+
+def frame(ax,layout,gaps=()):
+    from matplotlib import rcParams
+
+    X = arange(0,95,5)
+    Y = tick_lengths(X,1,.5)
+    segs = concatenate((axis_ticks(X,0,Y),
+                        axis_ticks(X,90,90-Y),
+                        axis_ticks(X,0,Y,vertical=True),
+                        axis_ticks(X,90,90-Y,vertical=True)))
+    scale = render.point_scale(ax)
+    segs = [column_stack(cut_gaps(s[:,0], s[:,1], gaps, scale)) for s in segs]
+    render.draw_segments(ax,segs,'k',rcParams['lines.linewidth'])
+    for (x, y, txt) in zip(*layout):
+        ax.text(x, y, txt,
+                horizontalalignment='center',
+                verticalalignment='center',
+                fontsize=font_size,
+                color='0.0')
+
+# grid lines on the major ticks, below the curves as those of ax.grid(),
+# with the footprints of the labels cut out
+def grid(ax,gaps):
+    from matplotlib import rcParams
+    scale = render.point_scale(ax)
+    segs = []
+    for x in arange(0,95,5):
+        segs.append(column_stack(cut_gaps([x,x], extent[2:], gaps, scale)))
+    for y in arange(0,95,10):
+        segs.append(column_stack(cut_gaps(extent[:2], [y,y], gaps, scale)))
+    lc = render.draw_segments(ax, segs, rcParams['grid.color'],
+                              rcParams['grid.linewidth'])
+    lc.set_zorder(1.5)
+
+
+#############################################################################
+# draw whole diagram, returns the figure
+
+def draw(tol=tol, simplification=simplification):
+    fig = render.new_figure()
+    ax = fig.add_subplot(111)
+    ax.axis(extent)
+
+    with profiling.stage('format_axes', fig):
+        format_axes(ax)
+
+    s = spec([0,5,10,12.5,15,17.5]+list(range(20,90,1)), tol,
+             [d for d in [0,5,10,15]+list(range(20,90)) if d%5==0])
+    label_layout, label_gaps = curve_label_layout(ax,s)
+    frame_layout, frame_gaps = frame_label_layout()
+    own = dict(zip(s['labels']['params'], label_gaps))
+
+    with profiling.stage('curves', fig):
+        tiers = curve_tiers(ax,s,simplification,
+                            [own.get(d, []) + frame_gaps for d in s['params']],
+                            file_name)
+        # from the least emphasized up
+        render.draw_tiers(ax, tiers[::-1], styles[::-1])
+
+    with profiling.stage('curve_labels', fig):
+        tier = s['tier'](s['labels']['params'])
+        curve_labels(ax,label_layout,[styles[i]['color'] for i in tier])
+
+    with profiling.stage('frame', fig):
+        frame(ax,frame_layout,frame_gaps)
+        grid(ax,[g for gaps in label_gaps for g in gaps] + frame_gaps)
+    with profiling.stage('fix_page', fig):
+        render.fix_page(fig)
+    return fig
+
+# simplified diagram for an insert
+def draw_insert(tol=tol, simplification=simplification):
+    fig = render.new_figure()
+    ax = fig.add_subplot(111)
+    ax.axis(extent)
+    ds = list(range(0,90,10))
+    s = spec(ds, tol, ds)
+    del s['tier'], s['tiers']
+    label_layout, label_gaps = curve_label_layout(ax,s)
+    tiers = curve_tiers(ax,s,simplification,label_gaps)
+    render.draw_tiers(ax, tiers, [dict(styles[0], color='k')])
+    curve_labels(ax,label_layout,['k']*len(ds))
+    return fig
+
+# create and save whole diagram
+def create(dire=dire, formats=('svg','pdf'), tol=tol, workers=None,
+           simplification=simplification):
+    with profiling.diagram(file_name):
+        fig = draw(tol, simplification)
+        render.save(fig, dire, file_name, formats, workers)
+    return fig
+
+if __name__ == '__main__':
+    render.log_to_stdout()
+    create()
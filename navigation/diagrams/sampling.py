@@ -0,0 +1,116 @@
+# Copyright 2014 Harri Ojanen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# sampling.py
+#
+# Error-bounded adaptive sampling of parametric curves.
+#
+# A curve is a function f(t) -> (x,y) on arrays of the parameter, in
+# plot units, with nan where the curve is not defined. Starting from a
+# coarse uniform grid every interval is bisected, all intervals of a
+# level in one vectorized evaluation, until the curve point at the
+# middle of the interval lies within 'tol' of the middle of the chord.
+# Intervals with a defined and an undefined end are bisected down to
+# 'min_step' to locate the end of the curve, e.g. where |cos LHA| -> 1
+# in the rust auxiliary diagram, and further until the curve would not
+# move more than 'tol' across them at the speed of the interval next to
+# them, so the curves reach within 'tol' of where they end or are cut
+# by a mask even where the parameter runs fast there.
+#
+# The middle-of-chord distance bounds the distance of the polyline from
+# the curve at the middle of each interval and also catches a parameter
+# speeding up along the interval, so flat stretches get few vertices
+# and steep ends many.
+
+from numpy import *
+
+__all__ = ['adaptive_sample', 'adaptive_family']
+
+
+# a single curve f(t) for t from t0 to t1, as (x, y)
+def adaptive_sample(f, t0, t1, tol, n=17, min_step=None, max_levels=30):
+    return adaptive_family(lambda t, k: f(t), [0], t0, t1, tol, n,
+                           min_step, max_levels)[0]
+
+# length in plot units of the intervals i, of widths dt, with one end
+# defined, were the curve to go on across them at the speed of the
+# defined interval next to them, nan if there is none. Bisecting the
+# end of a curve until this is within tol takes it within tol of where
+# it ends or is cut, however fast it moves in the parameter there.
+def end_length(i, dt, both, x, y):
+    speed = where(both, hypot(x[i+1] - x[i], y[i+1] - y[i])/dt, nan)
+    j = arange(len(i))
+    # the intervals next to each other are those sharing a point
+    prev = concatenate(([False], i[1:] == i[:-1] + 1))
+    after = concatenate((i[:-1] + 1 == i[1:], [False]))
+    before = where(prev, speed[maximum(j-1, 0)], nan)
+    next = where(after, speed[minimum(j+1, len(i)-1)], nan)
+    return fmax(before, next)*dt
+
+# list of curves f(t, k) for each parameter k of the family, t from t0
+# to t1 (scalars or one per curve). All curves are refined together:
+# each level is a single call of f with the parameters of the
+# intervals, so f must broadcast over t and k as flat arrays.
+def adaptive_family(f, ks, t0, t1, tol, n=17, min_step=None, max_levels=30):
+    ks = asarray(ks)
+    m = len(ks)
+    t0 = broadcast_to(asarray(t0, dtype=float), (m,))
+    t1 = broadcast_to(asarray(t1, dtype=float), (m,))
+    if min_step is None:
+        min_step = (t1-t0)*1e-6
+    min_step = broadcast_to(asarray(min_step, dtype=float), (m,))
+    ids = repeat(arange(m), n)
+    t = linspace(t0, t1, n, axis=-1).ravel()
+    x, y = f(t, ks[ids])
+
+    for level in range(max_levels):
+        i = flatnonzero(ids[:-1] == ids[1:])
+        tm = .5*(t[i] + t[i+1])
+        xm, ym = f(tm, ks[ids[i]])
+
+        ok = isfinite(x) & isfinite(y)
+        okm = isfinite(xm) & isfinite(ym)
+        err = hypot(xm - .5*(x[i] + x[i+1]), ym - .5*(y[i] + y[i+1]))
+
+        both = ok[i] & ok[i+1]
+        edge = (ok[i] != ok[i+1]) | (okm & ~both)
+        dt = t[i+1] - t[i]
+        wide = dt > min_step[ids[i]]
+        refine = (wide & ((both & ~(err <= tol)) | edge) |
+                  (edge & (end_length(i, dt, both, x, y) > tol)))
+        if not refine.any():
+            break
+
+        ids = concatenate((ids, ids[i[refine]]))
+        t = concatenate((t, tm[refine]))
+        x = concatenate((x, xm[refine]))
+        y = concatenate((y, ym[refine]))
+        order = lexsort((t, ids))
+        ids = ids[order]
+        t = t[order]
+        x = x[order]
+        y = y[order]
+
+    # undefined points are only needed to break the polyline, keep one
+    # between two defined stretches of a curve
+    ok = isfinite(x) & isfinite(y)
+    keep = ok.copy()
+    keep[1:] |= ok[:-1] & (ids[:-1] == ids[1:])
+    ends = searchsorted(ids, arange(m+1))
+    curves = []
+    for (a, b) in zip(ends[:-1], ends[1:]):
+        k = keep[a:b]
+        curves.append((x[a:b][k], y[a:b][k]))
+    return curves
@@ -0,0 +1,93 @@
+# Copyright 2014 Harri Ojanen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# scales.py
+#
+# Tick marks for arcs and axes, shared by the diagrams.
+#
+# All graduations of a scale are computed as one (N,2,2) array of
+# segments, segs[i] = ((x1,y1),(x2,y2)), which render.draw_segments()
+# draws as a single LineCollection per color and width.
+
+from numpy import *
+
+__all__ = ['arc_ticks', 'axis_ticks', 'tick_lengths', 'vernier_angles',
+           'vernier_ticks', 'degree_ticks']
+
+
+#############################################################################
+# radial ticks on an arc
+#
+# angles in radians, r1 and r2 scalars or arrays of the same length
+
+def arc_ticks(angles, r1, r2):
+    a = asarray(angles, dtype=float).ravel()
+    c = cos(a)
+    s = sin(a)
+    segs = empty((len(a),2,2))
+    segs[:,0,0] = r1*c
+    segs[:,0,1] = r1*s
+    segs[:,1,0] = r2*c
+    segs[:,1,1] = r2*s
+    return segs
+
+
+#############################################################################
+# ticks across an axis
+#
+# horizontal axis: ticks from (p,c1) to (p,c2)
+# vertical axis:   ticks from (c1,p) to (c2,p)
+
+def axis_ticks(positions, c1, c2, vertical=False):
+    p = asarray(positions, dtype=float).ravel()
+    segs = empty((len(p),2,2))
+    if vertical:
+        segs[:,0,0] = c1
+        segs[:,1,0] = c2
+        segs[:,0,1] = p
+        segs[:,1,1] = p
+    else:
+        segs[:,0,0] = p
+        segs[:,1,0] = p
+        segs[:,0,1] = c1
+        segs[:,1,1] = c2
+    return segs
+
+# tick lengths for positions in steps of 5: long ticks at multiples of 10
+def tick_lengths(positions, major, minor):
+    p = asarray(positions)
+    return where(p % 10 == 0, major, minor)
+
+
+#############################################################################
+# Brown-Nassau arc scales
+
+# vernier: 30 divisions over 14.5 degrees starting at 'offset' in
+# direction 'sgn', longer ticks at every 5th and 10th division
+def vernier_angles(offset, sgn):
+    i = arange(31)
+    d = sgn*.5*i*29/30. + offset
+    r = where(i % 10 == 0, 0., where(i % 5 == 0, .5, 1.))
+    return d, r
+
+def vernier_ticks(offset, sgn, r1=91., r2=93.):
+    d, r = vernier_angles(offset, sgn)
+    return arc_ticks(radians(d), r1+r, r2)
+
+# whole degree ticks from r to r+1 and half degree ticks from r to r+.5
+def degree_ticks(d_first, d_last, r=93.):
+    d = arange(d_first, d_last+1)
+    return concatenate((arc_ticks(radians(d), r, r+1.),
+                        arc_ticks(radians(d[:-1]+.5), r, r+.5)))
@@ -0,0 +1,440 @@
+# Copyright 2014 Harri Ojanen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# server.py
+#
+# Local HTTP service rendering diagram variants on demand.
+#
+#   GET /render?diagram=brown_nassau_quarter&styles=dots&flipped=1&format=svg
+#
+# takes the keys of a batch variant (see batch.py) as query parameters:
+#
+#   diagram    one of batch.DIAGRAMS
+#   styles     'lines' or 'dots'                  (Brown-Nassau only)
+#   step, blk_step, flipped, density              (Brown-Nassau only)
+#              blk_step a list of at most one interval per style but
+#              the last, so a single one, e.g. blk_step=10, with the
+#              named styles; step and density within step_range and
+#              density_range
+#   format     'svg', 'pdf' or 'png', default svg
+#   dpi        of a png, default 300
+#
+# and answers with the rendered file, 400 for an invalid query and 500
+# for a failed render. GET /status gives the cache and queue counts as
+# JSON.
+#
+# Renders run in a pool of 'workers' processes, so a burst of requests
+# never runs more renders at once than there are workers; requests
+# beyond max_pending waiting renders are refused with 503. Identical
+# requests arriving while one is being rendered wait for that render
+# instead of starting their own. The rendered bytes are kept in an LRU
+# cache in memory, up to mem_bytes, and in files on disk, up to
+# disk_bytes, under a key made of the variant with the defaults filled
+# in and a hash of the code. The header X-Cache of the answer tells
+# where it came from: memory, disk, render or shared. Run as
+#
+#   python -m navigation.diagrams.server [-p PORT] [-j N] [--cache DIR]
+#                                        [--memory MB] [--disk MB]
+
+import collections
+import hashlib
+import json
+import math
+import os
+import shutil
+import tempfile
+import threading
+
+from . import batch, cache
+from .geometry import check_tiers
+
+host = '127.0.0.1'
+port = 8000
+
+# worker processes, None for one per cpu
+workers = None
+
+# renders queued or running before new ones are refused
+max_pending = 32
+
+# cache limits in bytes
+mem_bytes = 64*2**20
+disk_bytes = 1024*2**20
+
+# accepted grid steps and densities, which bound the time of a single
+# render to a few seconds at the finest
+step_range = (.1, 30)
+density_range = (.25, 8)
+
+FORMATS = {'svg': 'image/svg+xml', 'pdf': 'application/pdf',
+           'png': 'image/png'}
+
+
+#############################################################################
+# variants from query parameters
+
+def number(txt):
+    v = float(txt)
+    if not math.isfinite(v):
+        raise ValueError('expected a finite number, got %r' % txt)
+    if v.is_integer():
+        return int(v)
+    return v
+
+def flag(txt):
+    if txt.lower() in ('1', 'true', 'yes'):
+        return True
+    elif txt.lower() in ('0', 'false', 'no'):
+        return False
+    raise ValueError('expected a boolean, got %r' % txt)
+
+# the variant and format of a query, a dict of single values, with the
+# defaults of the diagram module filled in so that equal renders get
+# equal keys; raises ValueError for anything invalid
+def parse_query(query):
+    query = dict(query)
+    name = query.pop('diagram', 'brown_nassau_quarter')
+    module = batch.diagram_module(name)
+    ext = query.pop('format', 'svg')
+    if ext not in FORMATS:
+        raise ValueError('unknown format %r, expected one of %s'
+                         % (ext, ', '.join(sorted(FORMATS))))
+    dpi = None
+    if ext == 'png':
+        dpi = number(query.pop('dpi', '300'))
+        if not 0 < dpi <= 2400:
+            raise ValueError('dpi must be in (0, 2400], see tiles.py for more')
+
+    variant = {'diagram': name}
+    if name.startswith('brown_nassau'):
+        styles = query.pop('styles', 'lines')
+        if styles not in ('lines', 'dots'):
+            raise ValueError("styles must be 'lines' or 'dots'")
+        variant['styles'] = styles
+        variant['flipped'] = flag(query.pop('flipped', '0'))
+        variant['step'] = number(query.pop('step', str(module.step)))
+        blk_step = query.pop('blk_step', None)
+        if blk_step is None:
+            variant['blk_step'] = module.blk_step
+        else:
+            steps = [number(s) for s in blk_step.split(',')]
+            if not all([0 < s <= 90 for s in steps]):
+                raise ValueError('blk_step must be in (0, 90]')
+            check_tiers(batch.variant_styles(module, styles), steps)
+            variant['blk_step'] = steps[0] if len(steps) == 1 else steps
+        variant['density'] = number(query.pop('density', str(module.density)))
+        for param, (lo, hi) in (('step', step_range),
+                                ('density', density_range)):
+            if not lo <= variant[param] <= hi:
+                raise ValueError('%s must be in [%g, %g]' % (param, lo, hi))
+        # the native backend writes vector formats only
+        variant['backend'] = 'matplotlib' if ext == 'png' else module.backend
+    if query:
+        raise ValueError('unknown parameters for %s: %s'
+                         % (name, ', '.join(sorted(query))))
+    return variant, ext, dpi
+
+_code_version = None
+
+# hash of all modules of the diagrams, any change in them invalidates
+# the renders on disk
+def code_version():
+    global _code_version
+    if _code_version is None:
+        dire = os.path.dirname(os.path.abspath(__file__))
+        h = hashlib.sha1()
+        for name in sorted(os.listdir(dire)):
+            if name.endswith('.py'):
+                with open(os.path.join(dire, name), 'rb') as f:
+                    h.update(f.read())
+        _code_version = h.hexdigest()
+    return _code_version
+
+def render_key(variant, ext, dpi):
+    txt = json.dumps({'variant': variant, 'format': ext, 'dpi': dpi,
+                      'version': code_version()}, sort_keys=True)
+    return hashlib.sha1(txt.encode('utf-8')).hexdigest()
+
+
+#############################################################################
+# rendering, in the worker processes
+
+# the bytes of the variant rendered in one format
+def render_bytes(variant, ext, dpi):
+    dire = tempfile.mkdtemp(prefix='navigation-render-')
+    try:
+        fmt = ext if dpi is None else (ext, dpi)
+        r = batch.render_variant(dict(variant, dire=dire, formats=[fmt]))
+        with open(r['paths'][0], 'rb') as f:
+            return f.read()
+    finally:
+        shutil.rmtree(dire, ignore_errors=True)
+
+
+#############################################################################
+# caches
+
+# rendered bytes by key, least recently used dropped first when over
+# 'limit' bytes
+class MemoryCache:
+    def __init__(self, limit):
+        self.limit = limit
+        self.size = 0
+        self.entries = collections.OrderedDict()
+
+    def get(self, key):
+        data = self.entries.get(key)
+        if data is not None:
+            self.entries.move_to_end(key)
+        return data
+
+    def put(self, key, data):
+        if len(data) > self.limit:
+            return
+        if key in self.entries:
+            self.size -= len(self.entries.pop(key))
+        self.entries[key] = data
+        self.size += len(data)
+        while self.size > self.limit:
+            k, d = self.entries.popitem(last=False)
+            self.size -= len(d)
+
+# rendered bytes as files dire/<key>, their modification time the last
+# use, evicted as the geometry cache is (see cache.evict())
+class DiskCache:
+    def __init__(self, dire, limit):
+        self.dire = dire
+        self.limit = limit
+
+    def get(self, key):
+        path = os.path.join(self.dire, key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path, None)
+        except (IOError, OSError):
+            return None
+        return data
+
+    def put(self, key, data):
+        if self.limit <= 0:
+            return
+        try:
+            if not os.path.isdir(self.dire):
+                os.makedirs(self.dire)
+            fd, tmp = tempfile.mkstemp(dir=self.dire, prefix='.tmp-')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, os.path.join(self.dire, key))
+            cache.evict(self.limit, self.dire)
+        except (IOError, OSError):
+            pass
+
+
+#############################################################################
+# the service: caches, pool and the renders in flight
+
+class Service:
+    def __init__(self, dire=None, workers=workers, mem_bytes=mem_bytes,
+                 disk_bytes=disk_bytes, max_pending=max_pending):
+        from concurrent.futures import ProcessPoolExecutor
+        if dire is None:
+            dire = cache.user_cache_dir('renders')
+        self.memory = MemoryCache(mem_bytes)
+        self.disk = DiskCache(dire, disk_bytes)
+        self.pool = ProcessPoolExecutor(workers or os.cpu_count() or 1)
+        self.max_pending = max_pending
+        self.lock = threading.RLock()
+        self.pending = {}
+        self.counts = collections.Counter()
+
+    # the bytes of the query and where they came from; raises ValueError
+    # for an invalid query, Busy when too many renders are queued and
+    # RenderError when the render fails. The lock is not held while
+    # reading the disk cache, so the memory and the renders in flight
+    # are looked at again after it.
+    def get(self, query):
+        variant, ext, dpi = parse_query(query)
+        key = render_key(variant, ext, dpi)
+
+        with self.lock:
+            hit = self.lookup(key, ext)
+        source = 'shared'
+        if hit is None:
+            data = self.disk.get(key)
+            with self.lock:
+                if data is not None:
+                    self.memory.put(key, data)
+                    return self.hit('disk', data, ext)
+                hit = self.lookup(key, ext)
+                if hit is None:
+                    hit = self.submit(key, variant, ext, dpi)
+                    source = 'render'
+        if isinstance(hit, tuple):
+            return hit
+        try:
+            data = hit.result()
+        except Exception as e:
+            raise RenderError('%s: %s' % (type(e).__name__, e))
+        with self.lock:
+            return self.hit(source, data, ext)
+
+    # with the lock held: the bytes of a render in memory or just
+    # finished, a render in flight, or None
+    def lookup(self, key, ext):
+        data = self.memory.get(key)
+        if data is not None:
+            return self.hit('memory', data, ext)
+        future = self.pending.get(key)
+        if future is None:
+            return None
+        if future.done() and future.exception() is None:
+            # finished but done() not yet called
+            data = future.result()
+            self.memory.put(key, data)
+            return self.hit('memory', data, ext)
+        return future
+
+    # with the lock held: a new render
+    def submit(self, key, variant, ext, dpi):
+        if len(self.pending) >= self.max_pending:
+            self.counts['refused'] += 1
+            raise Busy()
+        future = self.pool.submit(render_bytes, variant, ext, dpi)
+        self.pending[key] = future
+        # the lock is reentrant for a render that has already finished
+        future.add_done_callback(lambda f, key=key: self.done(key, f))
+        return future
+
+    def hit(self, source, data, ext):
+        self.counts[source] += 1
+        return data, FORMATS[ext], source
+
+    # called once per render, shared or not
+    def done(self, key, future):
+        data = None
+        if future.exception() is None:
+            data = future.result()
+            self.disk.put(key, data)
+        with self.lock:
+            if data is not None:
+                self.memory.put(key, data)
+            del self.pending[key]
+
+    def status(self):
+        with self.lock:
+            return {'pending': len(self.pending),
+                    'memory': {'entries': len(self.memory.entries),
+                               'bytes': self.memory.size,
+                               'limit': self.memory.limit},
+                    'disk': {'dire': self.disk.dire,
+                             'limit': self.disk.limit},
+                    'requests': dict(self.counts)}
+
+    def close(self):
+        self.pool.shutdown()
+
+class Busy(Exception):
+    pass
+
+# any error of a render, as opposed to the ValueError of a bad query
+class RenderError(Exception):
+    pass
+
+
+#############################################################################
+# http
+
+def handler(service):
+    from http.server import BaseHTTPRequestHandler
+    from urllib.parse import parse_qsl, urlsplit
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path == '/status':
+                body = json.dumps(service.status(), indent=1).encode('utf-8')
+                return self.answer(200, body, 'application/json')
+            if url.path != '/render':
+                return self.error(404, 'not found, try /render or /status')
+            query = parse_qsl(url.query, strict_parsing=False)
+            if len(set(k for (k, v) in query)) < len(query):
+                return self.error(400, 'repeated parameters')
+            try:
+                data, content_type, source = service.get(query)
+            except ValueError as e:
+                return self.error(400, str(e))
+            except Busy:
+                return self.error(503, 'too many renders queued',
+                                  {'Retry-After': '1'})
+            except RenderError as e:
+                return self.error(500, 'render failed: %s' % e)
+            except Exception as e:
+                return self.error(500, 'internal error: %s' % e)
+            self.answer(200, data, content_type, {'X-Cache': source})
+
+        def error(self, code, message, headers={}):
+            self.answer(code, (message + '\n').encode('utf-8'),
+                        'text/plain; charset=utf-8', headers)
+
+        def answer(self, code, body, content_type, headers={}):
+            self.send_response(code)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            for (k, v) in headers.items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+# serve until interrupted
+def serve(service, host=host, port=port):
+    from http.server import ThreadingHTTPServer
+    httpd = ThreadingHTTPServer((host, port), handler(service))
+    print('serving on http://%s:%d/render' % httpd.server_address[:2])
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        service.close()
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='Serve rendered diagrams.')
+    parser.add_argument('--host', default=host)
+    parser.add_argument('-p', '--port', type=int, default=port)
+    parser.add_argument('-j', '--workers', type=int, default=workers,
+                        help='worker processes, default one per cpu')
+    parser.add_argument('--cache', default=None, metavar='DIR',
+                        help='directory of the renders on disk, default '
+                             '$XDG_CACHE_HOME/navigation/renders')
+    parser.add_argument('--memory', type=float, default=mem_bytes/2.**20,
+                        metavar='MB', help='memory cache size')
+    parser.add_argument('--disk', type=float, default=disk_bytes/2.**20,
+                        metavar='MB', help='disk cache size')
+    parser.add_argument('--max-pending', type=int, default=max_pending,
+                        help='renders queued before refusing more')
+    args = parser.parse_args(argv)
+
+    service = Service(args.cache, args.workers, int(args.memory*2**20),
+                      int(args.disk*2**20), args.max_pending)
+    serve(service, args.host, args.port)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+# Copyright 2014 Harri Ojanen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# simplify.py
+#
+# Polyline simplification and coordinate quantization, applied to the
+# computed curves before they are drawn.
+#
+# Douglas-Peucker keeps the end points of a polyline and, recursively,
+# the vertex farthest from the segment between the ends while that
+# distance exceeds 'tol'; the result stays within 'tol' of the
+# original. Quantization then rounds the vertices to multiples of
+# 'grid' and drops repeated vertices, moving them by at most grid/sqrt(2).
+#
+# Both work in output units: coordinates are divided by 'scale', the
+# data units per output unit in x and y (see render.point_scale()), so
+# tol and grid are in points whatever the aspect of the axes. Curves
+# may be broken by nan, each piece is simplified on its own and the
+# breaks are kept.
+
+from numpy import *
+
+__all__ = ['douglas_peucker', 'quantize', 'simplify_curve',
+           'simplify_tiers', 'vertex_count']
+
+
+#############################################################################
+# single polylines without nan
+
+# mask of the vertices kept by Douglas-Peucker
+def douglas_peucker(x, y, tol):
+    n = len(x)
+    keep = zeros(n, dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, n-1)]
+    while stack:
+        i, j = stack.pop()
+        if j - i < 2:
+            continue
+        dx = x[j] - x[i]
+        dy = y[j] - y[i]
+        px = x[i+1:j] - x[i]
+        py = y[i+1:j] - y[i]
+        l2 = dx*dx + dy*dy
+        if l2 > 0:
+            u = clip((px*dx + py*dy)/l2, 0, 1)
+            dist = hypot(px - u*dx, py - u*dy)
+        else:
+            dist = hypot(px, py)
+        k = argmax(dist)
+        if dist[k] > tol:
+            k += i+1
+            keep[k] = True
+            stack.append((i, k))
+            stack.append((k, j))
+    return keep
+
+# vertices rounded to multiples of grid, repeated vertices dropped
+def quantize(x, y, grid):
+    x = around(x/grid)*grid
+    y = around(y/grid)*grid
+    keep = ones(len(x), dtype=bool)
+    keep[1:] = (x[1:] != x[:-1]) | (y[1:] != y[:-1])
+    return x[keep], y[keep]
+
+
+#############################################################################
+# curves and families
+
+# curve (x,y) simplified within tol and quantized to grid, either may
+# be None to skip that step
+def simplify_curve(x, y, tol=None, grid=None, scale=(1., 1.)):
+    x = asarray(x, dtype=float)/scale[0]
+    y = asarray(y, dtype=float)/scale[1]
+
+    ok = isfinite(x) & isfinite(y)
+    edges = flatnonzero(diff(concatenate(([False], ok, [False]))))
+    xs = []
+    ys = []
+    for (i, j) in zip(edges[::2], edges[1::2]):
+        xi = x[i:j]
+        yi = y[i:j]
+        if tol is not None and j - i > 2:
+            keep = douglas_peucker(xi, yi, tol)
+            xi = xi[keep]
+            yi = yi[keep]
+        if grid is not None:
+            xi, yi = quantize(xi, yi, grid)
+        if xs:
+            xs.append([nan])
+            ys.append([nan])
+        xs.append(xi)
+        ys.append(yi)
+
+    if not xs:
+        return x[:0], y[:0]
+    return concatenate(xs)*scale[0], concatenate(ys)*scale[1]
+
+# tiers as in geometry.grid_curves(), each curve simplified
+def simplify_tiers(tiers, tol=None, grid=None, scale=(1., 1.)):
+    return [[simplify_curve(x, y, tol, grid, scale) for (x, y) in tier]
+            for tier in tiers]
+
+def vertex_count(tiers):
+    return int(sum([len(x) for tier in tiers for (x, y) in tier]))
@@ -0,0 +1,302 @@
+# Copyright 2014 Harri Ojanen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# tables.py
+#
+# Tables of the prime vertical crossing, the quantities of the Rust
+# auxiliary diagram, over a latitude x declination grid:
+#
+#   lat, dec   degrees
+#   lha        LHA on the prime vertical, cos LHA = tan dec / tan lat
+#   altitude   Hc on the prime vertical, sin Hc = sin dec / sin lat
+#   hours      time of the crossing from the meridian passage, LHA/15
+#
+# one row per (lat, dec), declination varying fastest. Rows where the
+# body does not cross the prime vertical are left out unless all_rows
+# is set, and then hold nan.
+#
+# The grid is computed a chunk of latitudes at a time and written as it
+# goes, so memory is bounded by the chunk whatever the resolution, e.g.
+# 0.1' of latitude over all declinations. With workers > 1 the chunks
+# are computed and formatted in that many processes, a few at a time
+# ahead of the writer. The formats are
+#
+#   csv   one line per row, header line first
+#   txt   for printing: degrees and minutes to 0.1', the time as
+#         h:mm:ss, crossing rows only
+#   npy   a directory with one .npy file per column, of which any can
+#         be memory-mapped with numpy.load(..., mmap_mode='r')
+#
+# Run as
+#
+#   python -m navigation.diagrams.tables [-f csv|txt|npy] [--lat 0,90,0.1']
+#                                        [--dec 0,89,1] [--all] [-j N]
+#                                        output
+#
+# angles in degrees, or in minutes with a trailing '.
+
+import collections
+import os
+import struct
+
+from numpy import (around, arange, ascontiguousarray, broadcast_arrays, char,
+                   column_stack, empty, errstate, floor, isfinite, rint,
+                   where)
+
+from .geometry import prime_vertical_altitude, prime_vertical_lha
+
+COLUMNS = ('lat', 'dec', 'lha', 'altitude', 'hours')
+
+FORMATS = ('csv', 'txt', 'npy')
+
+# rows computed at a time
+chunk_rows = 2**18
+
+# csv output precision
+csv_formats = ('%.6f', '%.6f', '%.4f', '%.4f', '%.5f')
+
+
+#############################################################################
+# the table
+
+# the axis start, start+step, ... up to stop, as geometry.angle_range()
+# but only the part [i,j) of it
+def axis_count(start, stop, step):
+    return int(floor((stop - start)/step + 1e-9)) + 1
+
+def axis_part(start, step, i, j):
+    return around(start + arange(i, j)*step, 9)
+
+# columns of the rows of latitudes lat and declinations dec
+def prime_vertical_table(lat, dec, all_rows=False):
+    lat, dec = broadcast_arrays(lat[:,None], dec[None,:])
+    lat = lat.ravel()
+    dec = dec.ravel()
+    with errstate(divide='ignore', invalid='ignore'):
+        lha = prime_vertical_lha(lat, dec)
+        altitude = prime_vertical_altitude(lat, dec)
+    if not all_rows:
+        ok = isfinite(lha) & isfinite(altitude)
+        lat, dec, lha, altitude = lat[ok], dec[ok], lha[ok], altitude[ok]
+    return {'lat': lat, 'dec': dec, 'lha': lha, 'altitude': altitude,
+            'hours': lha/15.}
+
+
+#############################################################################
+# formatting, in the worker processes
+#
+# All rows of a chunk are formatted by a single % of the line format
+# repeated, which is a few times faster than savetxt() row by row.
+
+def format_rows(rows, line):
+    return (((line + '\n')*len(rows)) % tuple(rows.ravel().tolist())
+            ).encode('ascii')
+
+def format_csv(table):
+    return format_rows(column_stack([table[c] for c in COLUMNS]),
+                       ','.join(csv_formats))
+
+# degrees, with the sign, and minutes to 0.1', as two columns
+def dms(v):
+    tenths = rint(abs(v)*600).astype(int)
+    sign = where((v < 0) & (tenths > 0), '-', '')
+    return char.add(sign, (tenths//600).astype(str)), (tenths % 600)/10.
+
+def format_txt(table):
+    cols = []
+    for c in COLUMNS[:-1]:
+        d, m = dms(table[c])
+        cols += [d, m]
+    s = rint(table['lha']*240).astype(int)
+    cols += [s//3600, s//60 % 60, s % 60]
+    rows = empty((len(s), len(cols)), dtype=object)
+    for i in range(len(cols)):
+        rows[:,i] = cols[i]
+    return format_rows(rows, '%3s %04.1f  %3s %04.1f  %3s %04.1f  '
+                             '%3s %04.1f  %2d:%02d:%02d')
+
+TXT_HEADER = ('%8s  %8s  %8s  %8s  %8s\n'
+              % ('lat', 'dec', 'LHA', 'Hc', 'time')).encode('ascii')
+
+# the rows of the latitudes [i,j) of the axis 'lat', formatted; the
+# axes are (start, stop, step)
+def table_chunk(lat, dec, i, j, fmt, all_rows):
+    table = prime_vertical_table(axis_part(lat[0], lat[2], i, j),
+                                 axis_part(dec[0], dec[2], 0,
+                                           axis_count(*dec)),
+                                 all_rows and fmt != 'txt')
+    if fmt == 'csv':
+        return format_csv(table)
+    elif fmt == 'txt':
+        return format_txt(table)
+    return table
+
+def chunk_job(args):
+    return table_chunk(*args)
+
+
+#############################################################################
+# writers
+
+class TextWriter:
+    def __init__(self, path, header):
+        self.path = path
+        self.f = open(path, 'wb')
+        self.f.write(header)
+
+    def write(self, data):
+        self.f.write(data)
+
+    def close(self):
+        self.f.close()
+
+# .npy files with the header written last, once the length is known.
+# The header is padded to a fixed 128 bytes as the format allows.
+def npy_header(n, size=128):
+    d = "{'descr': '<f8', 'fortran_order': False, 'shape': (%d,), }" % n
+    d = d.ljust(size - 10 - 1) + '\n'
+    return (b'\x93NUMPY\x01\x00' + struct.pack('<H', len(d)) +
+            d.encode('latin1'))
+
+class ColumnWriter:
+    def __init__(self, dire):
+        self.path = dire
+        if not os.path.isdir(dire):
+            os.makedirs(dire)
+        self.n = 0
+        self.files = {}
+        for c in COLUMNS:
+            f = open(os.path.join(dire, c + '.npy'), 'wb')
+            f.write(npy_header(0))
+            self.files[c] = f
+
+    def write(self, table):
+        for c in COLUMNS:
+            self.files[c].write(ascontiguousarray(table[c], '<f8').data)
+        self.n += len(table['lat'])
+
+    def close(self):
+        for f in self.files.values():
+            f.seek(0)
+            f.write(npy_header(self.n))
+            f.close()
+
+def open_writer(path, fmt):
+    if fmt == 'csv':
+        return TextWriter(path, (','.join(COLUMNS) + '\n').encode('ascii'))
+    elif fmt == 'txt':
+        return TextWriter(path, TXT_HEADER)
+    elif fmt == 'npy':
+        return ColumnWriter(path)
+    raise ValueError('unknown format %r, expected one of %s'
+                     % (fmt, ', '.join(FORMATS)))
+
+
+#############################################################################
+# streaming
+
+# results of fn over jobs in order, at most 'ahead' of them computed but
+# not yet taken
+def ordered(pool, fn, jobs, ahead):
+    pending = collections.deque()
+    for job in jobs:
+        pending.append(pool.submit(fn, job))
+        if len(pending) >= ahead:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+# the chunks of the table formatted as 'fmt', in order
+def iter_table(lat, dec, fmt='npy', all_rows=False, chunk=None,
+               workers=None):
+    n_lat = axis_count(*lat)
+    n_dec = axis_count(*dec)
+    if chunk is None:
+        chunk = chunk_rows
+    step = max(chunk // max(n_dec, 1), 1)
+    jobs = [(lat, dec, i, min(i+step, n_lat), fmt, all_rows)
+            for i in range(0, n_lat, step)]
+    if workers is None or workers < 2 or len(jobs) < 2:
+        for job in jobs:
+            yield chunk_job(job)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(min(workers, len(jobs))) as pool:
+        for r in ordered(pool, chunk_job, jobs, 2*workers):
+            yield r
+
+# write the table of latitudes lat and declinations dec, each (start,
+# stop, step) in degrees, into 'path' (a directory for npy), returns the
+# number of rows written
+def write_table(path, lat=(0, 90, 1/60.), dec=(0, 89, 1), fmt='csv',
+                all_rows=False, chunk=None, workers=None):
+    if fmt not in FORMATS:
+        raise ValueError('unknown format %r, expected one of %s'
+                         % (fmt, ', '.join(FORMATS)))
+    for (start, stop, step) in (lat, dec):
+        if step <= 0 or stop < start:
+            raise ValueError('axes must be (start, stop, step) with '
+                             'start <= stop and step > 0')
+    writer = open_writer(path, fmt)
+    rows = 0
+    try:
+        for data in iter_table(lat, dec, fmt, all_rows, chunk, workers):
+            writer.write(data)
+            if fmt == 'npy':
+                rows += len(data['lat'])
+            else:
+                rows += data.count(b'\n')
+    finally:
+        writer.close()
+    return rows
+
+
+# an angle in degrees, or in minutes with a trailing '
+def angle(txt):
+    if txt.endswith("'"):
+        return float(txt[:-1])/60.
+    return float(txt)
+
+def axis(txt):
+    parts = [angle(a) for a in txt.split(',')]
+    if len(parts) != 3:
+        raise ValueError('expected start,stop,step')
+    return tuple(parts)
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='Tables of the prime vertical crossing.')
+    parser.add_argument('output', help="file, or directory for npy")
+    parser.add_argument('-f', '--format', default='csv', choices=FORMATS)
+    parser.add_argument('--lat', type=axis, default=(0, 90, 1/60.),
+                        help="latitudes start,stop,step, default 0,90,1'")
+    parser.add_argument('--dec', type=axis, default=(0, 89, 1),
+                        help='declinations start,stop,step, default 0,89,1')
+    parser.add_argument('--all', action='store_true',
+                        help='also the rows without a crossing, as nan')
+    parser.add_argument('--chunk', type=int, default=chunk_rows,
+                        help='rows computed at a time, default %d'
+                             % chunk_rows)
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(),
+                        help='worker processes, default one per cpu')
+    args = parser.parse_args(argv)
+    rows = write_table(args.output, args.lat, args.dec, args.format,
+                       args.all, args.chunk, args.workers)
+    print('%s: %d rows' % (args.output, rows))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,392 @@
+# Copyright 2014 Harri Ojanen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# tiles.py
+#
+# Tiled raster export for poster prints at 1200-2400 dpi.
+#
+# A single Agg canvas of the semi-circle base at 2400 dpi is some
+# 5700 x 9100 pixels, over 200 MB before matplotlib makes its copies.
+# Here the page (the bounding box of the figure, see export.py) is cut
+# into tiles of at most 'tile' x 'tile' pixels and each tile is drawn on
+# its own canvas, in worker processes that each unpickle the figure
+# once. Before drawing a tile the segments, dots, lines and texts
+# outside it are removed from the figure, and put back afterwards.
+#
+# The tiles are written either as PNG files with a JSON manifest,
+#
+#   {"dpi": ..., "width": px, "height": px, "tile": px,
+#    "tiles": [{"file": "r000_c000.png", "x": px, "y": px,
+#               "width": px, "height": px}, ...]}
+#
+# with x and y from the top left corner, or with single=True as one PNG
+# streamed out a row of tiles at a time. Memory is then bounded by the
+# tile size, and in the single image by a row of tiles, not by the page.
+# Tiles start on whole pixels, so they join without seams. Run as
+#
+#   python -m navigation.diagrams.tiles [-d dpi] [-t tile] [-j N]
+#                                       [--single] [--styles dots]
+#                                       [diagram] [output directory]
+
+import json
+import os
+import pickle
+import struct
+import zlib
+
+from numpy import (array, concatenate, empty, frombuffer, logical_and,
+                   nanmax, nanmin, uint8)
+
+from . import profiling
+
+# tile size in pixels
+tile_size = 2048
+
+# rows joined from the tiles and compressed at a time in a single image
+band = 64
+
+# geometry closer to a tile than this (points) is drawn with it, enough
+# for the widest strokes and dots of the diagrams
+margin = 10.
+
+_figure = None
+_cull = None
+
+
+#############################################################################
+# streamed png
+
+def png_chunk(f, kind, data):
+    f.write(struct.pack('>I', len(data)))
+    f.write(kind)
+    f.write(data)
+    f.write(struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff))
+
+# RGBA png written a band of rows at a time
+class PNGWriter:
+    def __init__(self, f, width, height, dpi=None):
+        self.f = f
+        self.width = width
+        self.rows = 0
+        self.height = height
+        self.z = zlib.compressobj(6)
+        f.write(b'\x89PNG\r\n\x1a\n')
+        png_chunk(f, b'IHDR', struct.pack('>IIBBBBB', width, height,
+                                          8, 6, 0, 0, 0))
+        if dpi is not None:
+            ppm = int(round(dpi/.0254))
+            png_chunk(f, b'pHYs', struct.pack('>IIB', ppm, ppm, 1))
+
+    # rows as an (n, width, 4) uint8 array
+    def write(self, rows):
+        n = len(rows)
+        lines = empty((n, self.width*4 + 1), dtype=uint8)
+        lines[:, 0] = 0
+        lines[:, 1:] = rows.reshape(n, -1)
+        self.rows += n
+        data = self.z.compress(lines.tobytes())
+        if data:
+            png_chunk(self.f, b'IDAT', data)
+
+    def close(self):
+        if self.rows != self.height:
+            raise ValueError('png has %d rows, expected %d'
+                             % (self.rows, self.height))
+        png_chunk(self.f, b'IDAT', self.z.flush())
+        png_chunk(self.f, b'IEND', b'')
+
+def write_png(path, rgba, dpi=None):
+    with open(path, 'wb') as f:
+        w = PNGWriter(f, rgba.shape[1], rgba.shape[0], dpi)
+        w.write(rgba)
+        w.close()
+    return path
+
+
+#############################################################################
+# tiles of the page
+
+def page_bbox(fig):
+    from .export import tight_bbox
+    return tight_bbox(fig)
+
+# page size in pixels and the tiles as (row, column, x, y, width, height)
+# in pixels from the top left corner
+def tile_grid(bbox, dpi, tile=tile_size):
+    width = int(round(bbox.width*dpi))
+    height = int(round(bbox.height*dpi))
+    tiles = []
+    for (r, y) in enumerate(range(0, height, tile)):
+        for (c, x) in enumerate(range(0, width, tile)):
+            tiles.append((r, c, x, y, min(tile, width - x),
+                          min(tile, height - y)))
+    return width, height, tiles
+
+def tile_name(r, c):
+    return 'r%03d_c%03d.png' % (r, c)
+
+
+#############################################################################
+# culling
+#
+# what is culled is found once per figure: the extent in data units of
+# each segment of a line collection, the offsets of each dot collection
+# and the lines, and later the display extents of the texts
+
+def cull_data(fig):
+    from matplotlib.collections import LineCollection, PathCollection
+    from matplotlib.lines import Line2D
+    items = []
+    for ax in fig.axes:
+        ax.apply_aspect()
+        for a in ax.get_children():
+            if not a.get_visible():
+                continue
+            if isinstance(a, LineCollection):
+                segs = a.get_segments()
+                if not segs:
+                    continue
+                lo = array([nanmin(s, axis=0) for s in segs])
+                hi = array([nanmax(s, axis=0) for s in segs])
+                items.append(('segments', ax, a, segs, lo, hi))
+            elif isinstance(a, PathCollection):
+                xy = a.get_offsets()
+                items.append(('dots', ax, a, xy, array(a.get_sizes())))
+            elif isinstance(a, Line2D):
+                xy = a.get_xydata()
+                if len(xy):
+                    items.append(('line', ax, a,
+                                  nanmin(xy, axis=0), nanmax(xy, axis=0)))
+        for t in ax.texts:
+            if t.get_visible() and t.get_text():
+                items.append(('text', ax, t))
+    return items
+
+# tile extent in display units and in the data units of ax, grown by
+# the margin
+def tile_extents(fig, ax, bbox, dpi, x, y, w, h):
+    k = fig.dpi/dpi
+    m = margin*fig.dpi/72.
+    x0 = bbox.x0*fig.dpi + x*k - m
+    x1 = bbox.x0*fig.dpi + (x + w)*k + m
+    y1 = bbox.y1*fig.dpi - y*k + m
+    y0 = bbox.y1*fig.dpi - (y + h)*k - m
+    inv = ax.transData.inverted()
+    (dx0, dy0), (dx1, dy1) = inv.transform([(x0, y0), (x1, y1)])
+    return ((x0, y0, x1, y1),
+            (min(dx0, dx1), min(dy0, dy1), max(dx0, dx1), max(dy0, dy1)))
+
+def inside(lo, hi, ext):
+    return logical_and.reduce([hi[:, 0] >= ext[0], lo[:, 0] <= ext[2],
+                               hi[:, 1] >= ext[1], lo[:, 1] <= ext[3]])
+
+# remove from the figure what lies outside the tile, returns a function
+# that puts it back
+def cull(fig, items, bbox, dpi, x, y, w, h):
+    from .layout import text_bbox
+    undo = []
+    for item in items:
+        kind, ax, a = item[:3]
+        disp, ext = tile_extents(fig, ax, bbox, dpi, x, y, w, h)
+        if kind == 'segments':
+            segs, lo, hi = item[3:]
+            keep = inside(lo, hi, ext)
+            a.set_segments([segs[i] for i in keep.nonzero()[0]])
+            undo.append(lambda a=a, segs=segs: a.set_segments(segs))
+        elif kind == 'dots':
+            xy, sizes = item[3:]
+            keep = inside(xy, xy, ext)
+            a.set_offsets(xy[keep])
+            if len(sizes) == len(xy):
+                a.set_sizes(sizes[keep])
+            undo.append(lambda a=a, xy=xy, sizes=sizes:
+                        (a.set_offsets(xy), a.set_sizes(sizes)))
+        else:
+            if kind == 'line':
+                lo, hi = item[3:]
+                visible = inside(lo[None], hi[None], ext)[0]
+            else:
+                b = text_bbox(a)
+                visible = (b.x1 >= disp[0] and b.x0 <= disp[2] and
+                           b.y1 >= disp[1] and b.y0 <= disp[3])
+            if not visible:
+                a.set_visible(False)
+                undo.append(lambda a=a: a.set_visible(True))
+
+    def restore():
+        for f in undo:
+            f()
+    return restore
+
+
+#############################################################################
+# rendering
+
+def load_figure(data):
+    global _figure, _cull
+    _figure = pickle.loads(data)
+    _cull = None
+
+# tile (x, y, w, h) of the page 'bbox' of the current figure at 'dpi',
+# as an (h, w, 4) uint8 array
+def render_tile(bbox, dpi, x, y, w, h):
+    import io
+    from matplotlib.transforms import Bbox
+    global _cull
+    fig = _figure
+    if _cull is None:
+        _cull = cull_data(fig)
+    restore = cull(fig, _cull, bbox, dpi, x, y, w, h)
+    try:
+        # a quarter pixel more, as the canvas size is truncated
+        b = Bbox.from_bounds(bbox.x0 + x/float(dpi),
+                             bbox.y1 - (y + h)/float(dpi),
+                             (w + .25)/dpi, (h + .25)/dpi)
+        buf = io.BytesIO()
+        fig.savefig(buf, format='rgba', dpi=dpi, bbox_inches=b)
+    finally:
+        restore()
+    return frombuffer(buf.getbuffer(), dtype=uint8).reshape(h, w, 4)
+
+def render_job(args):
+    bounds, dpi, x, y, w, h, path = args
+    from matplotlib.transforms import Bbox
+    rgba = render_tile(Bbox.from_bounds(*bounds), dpi, x, y, w, h)
+    if path is None:
+        return rgba
+    return write_png(path, rgba, dpi)
+
+# runs render_job() over jobs in 'workers' processes, or here
+class Renderer:
+    def __init__(self, fig, workers):
+        self.pool = None
+        if workers is not None and workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            self.pool = ProcessPoolExecutor(workers, initializer=load_figure,
+                                            initargs=(pickle.dumps(fig),))
+        else:
+            global _figure, _cull
+            _figure = fig
+            _cull = None
+
+    def map(self, jobs):
+        if self.pool is None:
+            return [render_job(j) for j in jobs]
+        return list(self.pool.map(render_job, jobs))
+
+    def close(self):
+        global _figure, _cull
+        if self.pool is not None:
+            self.pool.shutdown()
+        _figure = None
+        _cull = None
+
+
+#############################################################################
+# export
+
+# write the matplotlib figure 'fig' at 'dpi' in tiles of at most
+# 'tile' x 'tile' pixels into dire/<file_name>_tiles/ with manifest.json,
+# or with single=True as dire/<file_name>_<dpi>dpi.png; returns the path
+# of the manifest or of the png
+def export_tiles(fig, dire, file_name, dpi, tile=tile_size, workers=None,
+                 single=False):
+    bbox = page_bbox(fig)
+    width, height, tiles = tile_grid(bbox, dpi, tile)
+    if workers is None:
+        workers = os.cpu_count()
+    workers = min(workers, len(tiles))
+
+    renderer = Renderer(fig, workers)
+    try:
+        if single:
+            name = 'save png %ddpi single' % dpi
+            with profiling.stage(name):
+                return write_single(renderer, bbox, dpi, dire, file_name,
+                                    width, height, tiles)
+        with profiling.stage('save png %ddpi tiles' % dpi):
+            return write_tiles(renderer, bbox, dpi, dire, file_name, tile,
+                               width, height, tiles)
+    finally:
+        renderer.close()
+
+def write_tiles(renderer, bbox, dpi, dire, file_name, tile, width, height,
+                tiles):
+    tile_dire = os.path.join(dire, file_name + '_tiles')
+    if not os.path.isdir(tile_dire):
+        os.makedirs(tile_dire)
+    renderer.map([(bbox.bounds, dpi, x, y, w, h,
+                   os.path.join(tile_dire, tile_name(r, c)))
+                  for (r, c, x, y, w, h) in tiles])
+
+    manifest = {'dpi': dpi, 'width': width, 'height': height, 'tile': tile,
+                'tiles': [{'file': tile_name(r, c), 'x': x, 'y': y,
+                           'width': w, 'height': h}
+                          for (r, c, x, y, w, h) in tiles]}
+    path = os.path.join(tile_dire, 'manifest.json')
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=1)
+    return path
+
+def write_single(renderer, bbox, dpi, dire, file_name, width, height, tiles):
+    path = os.path.join(dire, '%s_%ddpi.png' % (file_name, dpi))
+    with open(path, 'wb') as f:
+        png = PNGWriter(f, width, height, dpi)
+        for r in sorted(set([t[0] for t in tiles])):
+            row = [t for t in tiles if t[0] == r]
+            parts = renderer.map([(bbox.bounds, dpi, x, y, w, h, None)
+                                  for (r, c, x, y, w, h) in row])
+            for i in range(0, len(parts[0]), band):
+                png.write(concatenate([p[i:i+band] for p in parts], axis=1))
+            del parts
+        png.close()
+    return path
+
+
+def main(argv=None):
+    import argparse
+    from . import batch
+    parser = argparse.ArgumentParser(
+        description='Write a diagram as a tiled high resolution png.')
+    parser.add_argument('diagram', nargs='?', default='brown_nassau_semi',
+                        choices=batch.DIAGRAMS)
+    parser.add_argument('dire', nargs='?', default='.',
+                        help='output directory')
+    parser.add_argument('-d', '--dpi', type=int, default=1200)
+    parser.add_argument('-t', '--tile', type=int, default=tile_size,
+                        help='tile size in pixels, default %d' % tile_size)
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='worker processes, default one per cpu')
+    parser.add_argument('--single', action='store_true',
+                        help='a single streamed png instead of tiles')
+    parser.add_argument('--styles', default='lines',
+                        choices=('lines', 'dots'),
+                        help='Brown-Nassau diagrams only')
+    args = parser.parse_args(argv)
+
+    module = batch.diagram_module(args.diagram)
+    if args.diagram.startswith('brown_nassau'):
+        styles = batch.variant_styles(module, args.styles)
+        fig = module.draw(styles, module.step, module.blk_step, False,
+                          simplification=None, backend='matplotlib')
+        file_name = module.diagram_name(styles, False)
+    else:
+        fig = module.draw(simplification=None)
+        file_name = module.file_name
+    print(export_tiles(fig, args.dire, file_name, args.dpi, args.tile,
+                       args.workers, args.single))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,362 @@
+# Copyright 2014 Harri Ojanen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# vector.py
+#
+# Native SVG and PDF writer for the Brown-Nassau diagrams, without
+# matplotlib.
+#
+# A Page stands in for both the figure and the axes: it takes polylines,
+# dots and texts in data coordinates, through render.draw_segments(),
+# render.draw_tiers() and the subset of Axes.text() the diagrams use,
+# and writes them straight out as path operators. The data extent,
+# set with axis(), is scaled into a page of 'size' points as the
+# matplotlib axes would be, plus 'pad' points around it.
+#
+# Texts are set in Helvetica (one of the standard PDF fonts, so nothing
+# is embedded) and measured with its metrics below. Dots are drawn the
+# size matplotlib draws the '.' marker, a disk of half the marker size
+# stroked with a 1 point edge, which is defined once per tier as a
+# filled disk and referenced by each dot (SVG defs/use, a PDF form
+# XObject), as matplotlib writes its markers. Text placement follows
+# matplotlib closely but not exactly, matplotlib stays the reference
+# renderer.
+
+import zlib
+from functools import lru_cache
+
+from numpy import (asarray, concatenate, cos, flatnonzero, isfinite, radians,
+                   sin, stack)
+
+__all__ = ['Page']
+
+# Helvetica advance widths of characters 32..126, per 1000 units
+helvetica_widths = [
+    278,278,355,556,556,889,667,222,333,333,389,584,278,333,278,278,
+    556,556,556,556,556,556,556,556,556,556,278,278,584,584,584,556,
+    1015,667,667,722,722,667,611,778,722,278,500,667,556,833,722,778,
+    667,778,722,667,611,722,667,944,667,667,611,278,278,278,469,556,
+    222,556,556,500,556,556,278,556,556,222,222,500,222,833,556,556,
+    556,556,333,500,278,556,500,722,500,500,500,334,260,334,584]
+ascent = .718
+descent = .207
+
+# line spacing of multi-line texts, in font sizes, as in matplotlib
+line_spacing = 1.2
+
+# size of the page in points when not given: the axes of a default
+# matplotlib figure
+default_size = (357.12, 266.112)
+
+named_colors = {'k': (0,0,0), 'w': (1,1,1), 'r': (1,0,0), 'g': (0,.5,0),
+                'b': (0,0,1)}
+
+
+#############################################################################
+# helpers
+
+def text_width(s, size):
+    return size*sum([helvetica_widths[ord(c)-32] if 32 <= ord(c) <= 126
+                     else 556 for c in s])/1000.
+
+# (r,g,b) and alpha of a color tuple, a named color or a gray level
+def rgba(clr):
+    if isinstance(clr, str):
+        if clr in named_colors:
+            return named_colors[clr], 1.
+        g = float(clr)
+        return (g,g,g), 1.
+    if len(clr) == 4:
+        return tuple(clr[:3]), clr[3]
+    return tuple(clr), 1.
+
+def fmt(values):
+    return ' '.join(['%.2f' % v for v in values])
+
+# radius in points of the disk drawn for a '.' marker of 'size'
+def dot_radius(size):
+    return size/4. + .5
+
+# PDF path of a circle of radius r about the origin, four Bezier arcs
+def pdf_circle(r):
+    k = .5523*r
+    return ('%.3f 0 m %.3f %.3f %.3f %.3f 0 %.3f c '
+            '%.3f %.3f %.3f %.3f %.3f 0 c '
+            '%.3f %.3f %.3f %.3f 0 %.3f c '
+            '%.3f %.3f %.3f %.3f %.3f 0 c h f'
+            % (r, r, k, k, r, r,  -k, r, -r, k, -r,
+               -r, -k, -k, -r, -r,  k, -r, r, -k, r))
+
+# pieces of a polyline broken by nan, (N,2) arrays with at least two
+# points
+def pieces(xy):
+    ok = isfinite(xy).all(axis=1)
+    edges = flatnonzero(concatenate(([True], ok[1:] != ok[:-1], [True])))
+    return [xy[i:j] for (i, j) in zip(edges[:-1], edges[1:])
+            if ok[i] and j - i > 1]
+
+
+# text laid out in its own frame: the anchor at the origin, x along
+# the text. Returns the lines as (dx, baseline, string) and the box
+# (x0, y0, x1, y1) around them. Kept per string, alignment and size,
+# the same labels recur in every variant.
+@lru_cache(maxsize=None)
+def text_layout(s, ha, va, ma, size):
+    rows = s.split('\n')
+    widths = [text_width(r, size) for r in rows]
+    w = max(widths)
+    h = ((len(rows)-1)*line_spacing + ascent + descent)*size
+    x0 = {'left': 0., 'center': -w/2, 'right': -w}[ha]
+    y0 = {'bottom': 0., 'center': -h/2, 'top': -h,
+          'baseline': -descent*size,
+          'center_baseline': -h/2}[va]
+
+    layout = []
+    for (k, r) in enumerate(rows):
+        dx = {'left': 0., 'center': (w - widths[k])/2,
+              'right': w - widths[k]}[ma]
+        base = y0 + h - ascent*size - k*line_spacing*size
+        layout.append((x0 + dx, base, r))
+    return tuple(layout), (x0, y0, x0 + w, y0 + h)
+
+
+#############################################################################
+# page
+
+class Page:
+
+    def __init__(self, size=default_size, pad=4.):
+        self.size = size
+        self.pad = pad
+        self.extent = None
+        self.items = []
+
+    # data extent (x0,x1,y0,y1), equal aspect
+    def axis(self, extent):
+        self.extent = extent
+        x0, x1, y0, y1 = extent
+        self.scale = min(self.size[0]/(x1-x0), self.size[1]/(y1-y0))
+        self.width = (x1-x0)*self.scale + 2*self.pad
+        self.height = (y1-y0)*self.scale + 2*self.pad
+
+    # page coordinates of data points, y up as in PDF
+    def transform(self, xy):
+        x0, x1, y0, y1 = self.extent
+        xy = asarray(xy, dtype=float)
+        return stack(((xy[...,0] - x0)*self.scale + self.pad,
+                      (xy[...,1] - y0)*self.scale + self.pad), axis=-1)
+
+    def lines(self, polylines, clr, w):
+        self.items.append(('lines', list(polylines), clr, w))
+
+    def dots(self, x, y, clr, size):
+        self.items.append(('dots', stack((x, y), axis=-1), clr, size))
+
+    def text(self, x, y, s, horizontalalignment='left',
+             verticalalignment='baseline', multialignment=None,
+             fontsize=10., color=(0,0,0), rotation=0., bbox=None):
+        self.items.append(('text', (x, y), s, horizontalalignment,
+                           verticalalignment, multialignment or
+                           horizontalalignment, fontsize, color, rotation,
+                           bbox))
+
+
+    #########################################################################
+    # SVG
+
+    def svg(self):
+        H = self.height
+        out = ['<?xml version="1.0" encoding="utf-8"?>\n'
+               '<svg xmlns="http://www.w3.org/2000/svg" '
+               'xmlns:xlink="http://www.w3.org/1999/xlink" version="1.1" '
+               'width="%.2fpt" height="%.2fpt" viewBox="0 0 %.2f %.2f">\n'
+               % (self.width, H, self.width, H)]
+        markers = 0
+
+        def svg_color(clr):
+            (r, g, b), a = rgba(clr)
+            c = '#%02x%02x%02x' % (int(round(255*r)), int(round(255*g)),
+                                   int(round(255*b)))
+            return c, a
+
+        for item in self.items:
+            kind = item[0]
+            if kind == 'lines':
+                polylines, clr, w = item[1:]
+                c, a = svg_color(clr)
+                d = []
+                for xy in polylines:
+                    for p in pieces(self.transform(xy)):
+                        p[:,1] = H - p[:,1]
+                        d.append('M' + fmt(p[0]) + 'L' + fmt(p[1:].ravel()))
+                out.append('<path d="%s" fill="none" stroke="%s" '
+                           'stroke-opacity="%g" stroke-width="%g" '
+                           'stroke-linejoin="round"/>\n'
+                           % (''.join(d), c, a, w))
+
+            elif kind == 'dots':
+                xy, clr, size = item[1:]
+                c, a = svg_color(clr)
+                p = self.transform(xy)
+                p = p[isfinite(p).all(axis=1)]
+                out.append('<defs><circle id="m%d" r="%.3f" fill="%s" '
+                           'fill-opacity="%g"/></defs>\n'
+                           % (markers, dot_radius(size), c, a))
+                out.append('<g>' +
+                           ''.join(['<use xlink:href="#m%d" x="%.2f" '
+                                    'y="%.2f"/>' % (markers, x, H - y)
+                                    for (x, y) in p]) + '</g>\n')
+                markers += 1
+
+            elif kind == 'text':
+                (x, y), s, ha, va, ma, size, clr, rot, bbox = item[1:]
+                (x, y), = self.transform([(x, y)])
+                layout, box = text_layout(s, ha, va, ma, size)
+                c, a = svg_color(clr)
+                out.append('<g transform="translate(%.2f %.2f) rotate(%g)">'
+                           % (x, H - y, -rot))
+                if bbox is not None:
+                    fc, fa = svg_color(bbox.get('facecolor', 'w'))
+                    out.append('<rect x="%.2f" y="%.2f" width="%.2f" '
+                               'height="%.2f" fill="%s" fill-opacity="%g"/>'
+                               % (box[0], -box[3], box[2]-box[0],
+                                  box[3]-box[1], fc, fa))
+                for (dx, base, r) in layout:
+                    r = (r.replace('&', '&amp;').replace('<', '&lt;')
+                         .replace('>', '&gt;'))
+                    out.append('<text x="%.2f" y="%.2f" font-family='
+                               '"Helvetica, Arial, sans-serif" '
+                               'font-size="%g" fill="%s" '
+                               'fill-opacity="%g">%s</text>'
+                               % (dx, -base, size, c, a, r))
+                out.append('</g>\n')
+
+        out.append('</svg>\n')
+        return ''.join(out)
+
+
+    #########################################################################
+    # PDF
+
+    def pdf(self):
+        ops = []
+        alphas = {}
+        markers = []
+
+        def pdf_color(clr, op):
+            (r, g, b), a = rgba(clr)
+            if a not in alphas:
+                alphas[a] = '/A%d' % len(alphas)
+            return '%s gs %.3f %.3f %.3f %s\n' % (alphas[a], r, g, b, op)
+
+        for item in self.items:
+            kind = item[0]
+            if kind == 'lines':
+                polylines, clr, w = item[1:]
+                ops.append('q %g w 0 J 1 j ' % w + pdf_color(clr, 'RG'))
+                for xy in polylines:
+                    for p in pieces(self.transform(xy)):
+                        ops.append(fmt(p[0]) + ' m ' +
+                                   ' l '.join(['%.2f %.2f' % tuple(v)
+                                               for v in p[1:]]) + ' l\n')
+                ops.append('S Q\n')
+
+            elif kind == 'dots':
+                xy, clr, size = item[1:]
+                p = self.transform(xy)
+                p = p[isfinite(p).all(axis=1)]
+                # the marker takes the fill color set here
+                name = '/M%d' % len(markers)
+                markers.append(dot_radius(size))
+                ops.append('q ' + pdf_color(clr, 'rg'))
+                ops.append(''.join(['q 1 0 0 1 %.2f %.2f cm %s Do Q\n'
+                                    % (x, y, name) for (x, y) in p]))
+                ops.append('Q\n')
+
+            elif kind == 'text':
+                (x, y), s, ha, va, ma, size, clr, rot, bbox = item[1:]
+                (x, y), = self.transform([(x, y)])
+                layout, box = text_layout(s, ha, va, ma, size)
+                c, sn = cos(radians(rot)), sin(radians(rot))
+                ops.append('q %.4f %.4f %.4f %.4f %.2f %.2f cm\n'
+                           % (c, sn, -sn, c, x, y))
+                if bbox is not None:
+                    ops.append(pdf_color(bbox.get('facecolor', 'w'), 'rg'))
+                    ops.append('%.2f %.2f %.2f %.2f re f\n'
+                               % (box[0], box[1], box[2]-box[0],
+                                  box[3]-box[1]))
+                ops.append(pdf_color(clr, 'rg'))
+                for (dx, base, r) in layout:
+                    r = (r.replace('\\', '\\\\').replace('(', '\\(')
+                         .replace(')', '\\)'))
+                    ops.append('BT /F1 %g Tf %.2f %.2f Td (%s) Tj ET\n'
+                               % (size, dx, base, r))
+                ops.append('Q\n')
+
+        content = zlib.compress(''.join(ops).encode('latin-1'))
+        gstates = ' '.join(['%s << /CA %g /ca %g >>' % (n, a, a)
+                            for (a, n) in alphas.items()])
+        xobjects = ' '.join(['/M%d %d 0 R' % (i, 6 + i)
+                             for i in range(len(markers))])
+        objects = [
+            b'<< /Type /Catalog /Pages 2 0 R >>',
+            b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+            ('<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] '
+             '/Contents 4 0 R /Resources << /Font << /F1 5 0 R >> '
+             '/ExtGState << %s >> /XObject << %s >> >> >>'
+             % (self.width, self.height, gstates, xobjects)
+             ).encode('latin-1'),
+            (b'<< /Length %d /Filter /FlateDecode >>\nstream\n'
+             % len(content)) + content + b'\nendstream',
+            b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica '
+            b'/Encoding /WinAnsiEncoding >>',
+        ]
+        for r in markers:
+            path = pdf_circle(r).encode('latin-1')
+            objects.append(b'<< /Type /XObject /Subtype /Form '
+                           b'/BBox [%.3f %.3f %.3f %.3f] /Length %d >>\n'
+                           b'stream\n' % (-r, -r, r, r, len(path)) +
+                           path + b'\nendstream')
+
+        out = [b'%PDF-1.4\n']
+        offsets = []
+        pos = len(out[0])
+        for (i, obj) in enumerate(objects):
+            chunk = b'%d 0 obj\n' % (i+1) + obj + b'\nendobj\n'
+            offsets.append(pos)
+            out.append(chunk)
+            pos += len(chunk)
+        xref = [b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects)+1)]
+        xref += [b'%010d 00000 n \n' % o for o in offsets]
+        out += xref
+        out.append(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n'
+                   b'%%%%EOF\n' % (len(objects)+1, pos))
+        return b''.join(out)
+
+
+    #########################################################################
+    # files
+
+    def write(self, path, ext):
+        if ext == 'svg':
+            with open(path, 'w') as f:
+                f.write(self.svg())
+        elif ext == 'pdf':
+            with open(path, 'wb') as f:
+                f.write(self.pdf())
+        else:
+            raise ValueError('the native backend writes svg and pdf, not %s'
+                             % ext)
+        return path
@@ -0,0 +1,135 @@
+# Copyright 2014 Harri Ojanen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# sight_reduction.py
+#
+# The astronomical triangle over arrays: what the Brown-Nassau computer
+# does graphically, one triangle at a time.
+#
+# Equatorial to horizontal coordinates:
+#
+#   sin Hc = sin lat sin dec + cos lat cos dec cos LHA
+#   Zn     = atan2(-cos dec sin LHA, sin dec cos lat - cos dec sin lat cos LHA)
+#
+# and back, by the symmetry of the triangle, with the same formulae for
+# (dec, LHA) from (Hc, Zn). All angles are in degrees, latitude and
+# declination north positive, LHA measured westward and Zn from north
+# eastward, both in [0,360).
+#
+# The inputs are broadcast against each other. Results are written into
+# the arrays given in 'out' if any, and are computed 'chunk' elements
+# at a time, so that the temporaries stay small and inputs and outputs
+# can be memory-mapped arrays larger than memory.
+
+from numpy import (arcsin, arctan2, asarray, broadcast_arrays, clip, cos,
+                   degrees, empty, mod, negative, radians, shares_memory, sin)
+
+__all__ = ['altitude_azimuth', 'declination_lha', 'local_hour_angle',
+           'intercept']
+
+chunk_size = 2**18
+
+
+#############################################################################
+# kernel
+
+# the triangle for a chunk: (a,b,c) -> (p,q) with
+# sin p = sin a sin b + cos a cos b cos c
+# q     = atan2(-cos b sin c, sin b cos a - cos b sin a cos c)
+def triangle(a, b, c, p, q):
+    a = radians(a)
+    b = radians(b)
+    c = radians(c)
+    sa = sin(a)
+    ca = cos(a, out=a)
+    sb = sin(b)
+    cb = cos(b, out=b)
+    sc = sin(c)
+    cc = cos(c, out=c)
+
+    # cos b cos c
+    cc *= cb
+    s = ca*cc
+    s += sa*sb
+    clip(s, -1, 1, out=s)
+    degrees(arcsin(s, out=s), out=p)
+
+    # north and east components
+    sb *= ca
+    cc *= sa
+    sb -= cc
+    sc *= cb
+    negative(sc, out=sc)
+    degrees(arctan2(sc, sb, out=sc), out=q)
+    mod(q, 360, out=q)
+
+
+#############################################################################
+# arrays
+
+def output_arrays(out, shape):
+    if out is None:
+        return empty(shape), empty(shape)
+    p, q = out
+    if p.shape != shape or q.shape != shape:
+        raise ValueError('output arrays must have shape %s' % (shape,))
+    return p, q
+
+def chunks(n, chunk):
+    if chunk is None:
+        chunk = chunk_size
+    for i in range(0, n, chunk):
+        yield i, min(i+chunk, n)
+
+def apply(a, b, c, out, chunk):
+    a, b, c = broadcast_arrays(asarray(a, dtype=float),
+                               asarray(b, dtype=float),
+                               asarray(c, dtype=float))
+    p, q = output_arrays(out, a.shape)
+    p_flat = p.reshape(-1)
+    q_flat = q.reshape(-1)
+    if not (shares_memory(p_flat, p) and shares_memory(q_flat, q)) and p.size:
+        raise ValueError('output arrays must be contiguous')
+
+    for i, j in chunks(a.size, chunk):
+        triangle(a.flat[i:j], b.flat[i:j], c.flat[i:j],
+                 p_flat[i:j], q_flat[i:j])
+    return p, q
+
+
+#############################################################################
+# sight reduction
+
+# computed altitude and azimuth (Hc, Zn) of a body at (dec, LHA) seen
+# from latitude lat
+def altitude_azimuth(lat, dec, lha, out=None, chunk=None):
+    return apply(lat, dec, lha, out, chunk)
+
+# declination and LHA (dec, LHA) of a body seen at (Hc, Zn) from
+# latitude lat
+def declination_lha(lat, hc, zn, out=None, chunk=None):
+    return apply(lat, hc, zn, out, chunk)
+
+# LHA from GHA and longitude, east positive
+def local_hour_angle(gha, lon):
+    return mod(asarray(gha, dtype=float) + lon, 360)
+
+# intercept in nautical miles (minutes of arc), towards the body when
+# positive, and azimuth Zn for observed altitudes ho
+def intercept(lat, dec, lha, ho, out=None, chunk=None):
+    hc, zn = altitude_azimuth(lat, dec, lha, out, chunk)
+    hc -= ho
+    hc *= -60
+    return hc, zn
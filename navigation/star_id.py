@@ -0,0 +1,134 @@
+# Copyright 2014 Harri Ojanen
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# star_id.py
+#
+# Star identification: which catalog stars can be seen at the observed
+# azimuth and altitude (Zn, Hc) from a given position at a given time.
+#
+# The catalog is a CSV file with the columns
+#
+#   name,sha,dec,mag
+#
+# SHA and declination in degrees; lines starting with '#' are skipped.
+#
+# The index keeps the stars sorted by declination together with their
+# unit vectors on the sphere. A query with tolerance r takes the
+# declination band [dec-r, dec+r] with two binary searches and then
+# compares unit vectors within that band only, so its cost depends on
+# the number of stars in the band and not on the size of the catalog.
+# Indexes are kept per file (and file modification time) once built.
+#
+# An observation is reduced to (dec, LHA) with sight_reduction, LHA to
+# GHA with the longitude (east positive) and GHA to SHA with the GHA of
+# Aries.
+
+import csv
+import os.path
+
+from numpy import (arccos, argsort, array, asarray, clip, cos, degrees,
+                   dot, float64, mod, radians, searchsorted, sin, stack)
+
+from .sight_reduction import declination_lha
+
+__all__ = ['load_catalog', 'build_index', 'star_index', 'gha_aries',
+           'query', 'identify']
+
+_indexes = {}
+
+
+#############################################################################
+# catalog and index
+
+def load_catalog(path):
+    names = []
+    values = []
+    with open(path) as f:
+        rows = csv.reader(line for line in f
+                          if line.strip() and not line.startswith('#'))
+        header = [h.strip() for h in next(rows)]
+        cols = [header.index(c) for c in ('name', 'sha', 'dec', 'mag')]
+        for row in rows:
+            names.append(row[cols[0]].strip())
+            values.append([float(row[c]) for c in cols[1:]])
+    values = array(values, dtype=float64).reshape(-1, 3)
+    return {'name': array(names, dtype=object),
+            'sha': values[:,0], 'dec': values[:,1], 'mag': values[:,2]}
+
+def unit_vectors(sha, dec):
+    sha = radians(sha)
+    dec = radians(dec)
+    return stack((cos(dec)*cos(sha), cos(dec)*sin(sha), sin(dec)), axis=-1)
+
+# index of a catalog: the stars sorted by declination, 'order' maps
+# back to the catalog
+def build_index(catalog):
+    order = argsort(catalog['dec'], kind='mergesort')
+    index = dict((k, v[order]) for (k, v) in catalog.items())
+    index['order'] = order
+    index['xyz'] = unit_vectors(index['sha'], index['dec'])
+    return index
+
+# index of the catalog file at 'path', built once per file version
+def star_index(path):
+    path = os.path.abspath(path)
+    key = (path, os.path.getmtime(path), os.path.getsize(path))
+    if key not in _indexes:
+        for k in [k for k in _indexes if k[0] == path]:
+            del _indexes[k]
+        _indexes[key] = build_index(load_catalog(path))
+    return _indexes[key]
+
+
+#############################################################################
+# time
+
+# GHA of Aries (degrees) at a Julian date (UT)
+def gha_aries(jd):
+    return mod(280.46061837 + 360.98564736629*(asarray(jd) - 2451545.0), 360)
+
+
+#############################################################################
+# queries
+
+# stars within 'tol' degrees of each (sha, dec), brighter than mag_limit
+# if given. Returns for each point a pair (stars, distances): catalog
+# indices nearest first and their angular distances in degrees.
+def query(index, sha, dec, tol, mag_limit=None):
+    sha = asarray(sha, dtype=float64).ravel()
+    dec = asarray(dec, dtype=float64).ravel()
+    xyz = unit_vectors(sha, dec)
+    lo = searchsorted(index['dec'], dec - tol, side='left')
+    hi = searchsorted(index['dec'], dec + tol, side='right')
+    cos_tol = cos(radians(tol))
+
+    results = []
+    for k in range(len(sha)):
+        c = dot(index['xyz'][lo[k]:hi[k]], xyz[k])
+        ok = c >= cos_tol
+        if mag_limit is not None:
+            ok &= index['mag'][lo[k]:hi[k]] <= mag_limit
+        i = ok.nonzero()[0]
+        dist = degrees(arccos(clip(c[i], -1, 1)))
+        nearest = argsort(dist, kind='mergesort')
+        results.append((index['order'][lo[k] + i[nearest]], dist[nearest]))
+    return results
+
+# candidate stars for observations (zn, hc) made at (lat, lon) when the
+# GHA of Aries was gha_aries, see query() for the result
+def identify(index, zn, hc, lat, lon, gha_aries, tol=2., mag_limit=None):
+    dec, lha = declination_lha(lat, hc, zn)
+    sha = mod(lha - asarray(lon) - asarray(gha_aries), 360)
+    return query(index, sha, dec, tol, mag_limit)